@@ -1,5 +1,6 @@
 import streamlit as st
 from data.data_loader import DataLoader
+from data.registry import get_registry
 from utils.styling import setup_styling
 from components.severity_analysis import SeverityAnalysis
 from components.vegetation_analysis import VegetationAnalysis
@@ -12,7 +13,14 @@ class WildfireAnalysisDashboard:
     def __init__(self):
         st.set_page_config(layout="wide", page_title="LA Wildfire Analysis")
         self.data_loader = DataLoader()
-        self.fire_data_loader = FireDataLoader()
+        # Datasets are loaded on first use. Every tab renders on each run, so
+        # start the CSVs the Vegetation tab reads and the hotspot indexes the
+        # Fire Progression tab reads while the Burn Severity tab (map tiles and
+        # its own GeoJSON only) renders. Only the first rerun in the process
+        # starts them.
+        self.data_loader.prefetch('veg_processed', 'trees_withburn', 'trees_processed',
+                                  'hotspot_index', 'hotspot_cube')
+        self.fire_data_loader = FireDataLoader(self.data_loader)
         setup_styling()
         
         # Initialize components
@@ -63,6 +71,14 @@ class WildfireAnalysisDashboard:
                      "Expanding", delta_color="inverse")
 
 
+    def display_memory_stats(self):
+        stats = get_registry().stats()
+        st.sidebar.caption(
+            f"Shared datasets: {stats['datasets']} "
+            f"({stats['shared_bytes'] / 1024 ** 2:,.1f} MiB) across {stats['sessions']} sessions, "
+            f"{stats['saved_bytes'] / 1024 ** 2:,.1f} MiB saved by sharing"
+        )
+
     def display_footer(self):
         st.markdown("""
         <div style='text-align: center; padding: 1rem; background-color: #f0f4f7; border-radius: 0.5rem; margin-top: 1rem;'>
@@ -110,6 +126,7 @@ class WildfireAnalysisDashboard:
 
 
         self.display_footer()
+        self.display_memory_stats()
 
 if __name__ == "__main__":
     app = WildfireAnalysisDashboard()
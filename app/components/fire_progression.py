@@ -1,33 +1,132 @@
+import base64
+
+import numpy as np
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-import requests
-import io
-
-# Caching the data fetch function for efficiency
-@st.cache_data
-def fetch_fire_data():
-    CSV_URL = "https://storage.googleapis.com/localsolve_assets/la_wildfires_jan_2025/filtered_la_january_2025_fire_hotspots_combined.csv"
-    response = requests.get(CSV_URL)
-
-    if response.status_code == 200:
-        csv_data = response.content
-        df = pd.read_csv(io.StringIO(csv_data.decode("utf-8")))
-        if not df.empty:
-            df['acq_date'] = pd.to_datetime(df['acq_date'])
-            df['acq_datetime'] = df['acq_date'] + pd.to_timedelta(
-                df['acq_time'].astype(str).str.zfill(4).str[:2] + ':' + 
-                df['acq_time'].astype(str).str.zfill(4).str[2:] + ':00'
-            )
-            return df
-    return pd.DataFrame()
+
+from data.data_loader import DataLoader
+from data.lod import level_of_detail, viewport_bounds
+from data.perimeters import perimeter_geojson
+from data.raster import colorize, colormap_lut, render_png, to_png
+from data.registry import get_registry
+from config import MAP_SETTINGS
+from utils.lru import ByteBudgetLRU
+
+TRACE_ARRAYS = ('x', 'y', 'lat', 'lon', 'customdata', 'text', 'hovertext')
+MARKER_ARRAYS = ('color', 'size')
+
+
+def array_nbytes(values):
+    """Approximate in-memory size of one trace array, counting text at its first value's length"""
+    if values is None or isinstance(values, (str, int, float)):
+        return 0
+    values = np.asarray(values)
+    if values.dtype == object and values.size:
+        return values.nbytes + values.size * len(str(values.flat[0]))
+    return values.nbytes
+
+
+def figure_nbytes(fig):
+    """Approximate size of ``fig`` from its trace arrays and map layer sources.
+
+    Cheap enough to run on every cache put, unlike serialising the figure.
+    """
+    traces = list(fig.data) + [trace for frame in fig.frames for trace in frame.data]
+    total = 0
+    for trace in traces:
+        total += sum(array_nbytes(getattr(trace, name, None)) for name in TRACE_ARRAYS)
+        marker = getattr(trace, 'marker', None)
+        if marker is not None:
+            total += sum(array_nbytes(getattr(marker, name, None)) for name in MARKER_ARRAYS)
+    for layer in fig.layout.mapbox.layers:
+        # Raster overlays are inlined as base64 data URIs
+        if isinstance(layer.source, str):
+            total += len(layer.source)
+    return total
+
+
+# Map figures shared by every session, keyed by (dataset version, selected
+# date, map view). Hits are handed to st.plotly_chart as they are, so they
+# are neither re-parsed nor re-validated; treat cached figures as read-only.
+figure_cache = ByteBudgetLRU(MAP_SETTINGS['FIGURE_CACHE_MAX_BYTES'], sizeof=figure_nbytes)
+
+# Rendered PNG overlays, keyed by (dataset version, bbox, zoom, selected date)
+raster_cache = ByteBudgetLRU(MAP_SETTINGS['RASTER_CACHE_MAX_BYTES'])
+
+MAP_WIDTH, MAP_HEIGHT = 1000, 600
 
 class FireDataLoader:
-    def __init__(self):
-        self.df = fetch_fire_data()  # Load cached data
+    """Fire progression view of the hotspot datasets of a ``DataLoader``.
+
+    The ``DataLoader`` owns every dataset derived from the hotspots and builds
+    each one once per process, the first time it is read, so the map only
+    pays for the layers it actually shows.
+    """
+
+    def __init__(self, data_loader=None):
+        self.source = data_loader or DataLoader()
         self.infrastructure = None
 
+    @property
+    def df(self):
+        """Time-sorted fire hotspots"""
+        return self.source.fire_hotspots
+
+    @property
+    def version(self):
+        """(digest, rows) of the hotspot table; keys the shared figure and raster caches"""
+        return self.source.asset_version('fire_hotspots'), len(self.df)
+
+    @property
+    def time_index(self):
+        return self.source.hotspot_index
+
+    @property
+    def spatial_index(self):
+        return self.source.hotspot_spatial_index
+
+    @property
+    def cube(self):
+        return self.source.hotspot_cube
+
+    @property
+    def perimeters(self):
+        return self.source.fire_perimeters
+
+    @property
+    def events(self):
+        """Per-event summary of the fire events the hotspots are clustered into"""
+        return self.source.fire_events
+
+    @property
+    def event_energy(self):
+        """Fire radiative energy (GJ) released by each fire event"""
+        return self.source.fire_event_energy
+
+    @property
+    def energy(self):
+        """Cumulative fire radiative energy grid"""
+        return self.source.fire_energy
+
+    @property
+    def spread(self):
+        """Arrival-time surface of the hotspots, or None without any"""
+        return self.source.fire_spread
+
+    def events_upto(self, selected_date, events):
+        """Hotspots of the given fire events up to ``selected_date``"""
+        return self.source.get_fire_data_for_date(selected_date, events)
+
+    def brightness_range(self):
+        """(min, max) brightness over the whole dataset, computed once per dataset version"""
+        def extent():
+            brightness = self.df['brightness']
+            return float(brightness.min()), float(brightness.max())
+        return get_registry().get_or_load(('fire_progression_brightness_range', self.version), extent,
+                                          owner=self.source)
+
 # # Fire Progression Class
 # class FireProgression:
 #     def __init__(self, data_loader):
@@ -42,32 +141,52 @@ class FireProgression:
             # Adjusted initial zoom for better default view
             st.session_state.map_center = {'lat': 34.18612130853171, 'lon': -118.337172042249, 'zoom': 10}
 
-    def create_map(self, df_filtered):
+    def create_map(self, df_filtered, is_prefix=True):
+        # Past LOD_MAX_POINTS markers, send zoom-sized grid cells instead of raw points.
+        # The spatial index only applies to date cutoffs, i.e. prefixes of the full table.
+        df_filtered, aggregated = level_of_detail(
+            df_filtered, st.session_state.map_center, st.session_state.map_center['zoom'],
+            MAP_WIDTH, MAP_HEIGHT, MAP_SETTINGS['LOD_MAX_POINTS'], MAP_SETTINGS['LOD_CELL_PIXELS'],
+            index=self.data_loader.spatial_index if is_prefix else None)
+        if aggregated:
+            hover_data = {
+                "count": True,
+                "latitude": ":.2f",
+                "longitude": ":.2f",
+                "brightness": ":.1f",
+                "frp": ":.1f"
+            }
+        else:
+            hover_data = {
+                "acq_datetime": "|%Y-%m-%d %H:%M",
+                #"confidence": ":.0f",
+                "latitude": ":.2f",
+                "longitude": ":.2f",
+                "brightness": ":.1f"
+            }
+
         # Use a reliable map style that doesn't require tokens
         fig = px.scatter_mapbox(
             df_filtered,
             lat="latitude",
             lon="longitude",
             color="brightness",
-            hover_data={
-                "acq_datetime": "|%Y-%m-%d %H:%M",
-                #"confidence": ":.0f",
-                "latitude": ":.2f",
-                "longitude": ":.2f",
-                "brightness": ":.1f"
-            },
+            size="count" if aggregated else None,
+            hover_data=hover_data,
             size_max=8,
             opacity=0.7,
             mapbox_style="open-street-map",  # Changed to reliable style
             zoom=st.session_state.map_center['zoom'],
             center={"lat": st.session_state.map_center['lat'], "lon": st.session_state.map_center['lon']},
             color_continuous_scale=px.colors.sequential.YlOrRd,
-            labels={'brightness': 'Brightness Temperature (K)'}
+            labels={'brightness': 'Max Brightness Temperature (K)' if aggregated else 'Brightness Temperature (K)',
+                    'count': 'Hotspots', 'frp': 'Max FRP (MW)'}
         )
 
-        fig.update_traces(
-            marker=dict(size=6),
-            selector=dict(mode='markers'))
+        if not aggregated:
+            fig.update_traces(
+                marker=dict(size=6),
+                selector=dict(mode='markers'))
 
         fig.update_layout(
             margin=dict(l=0, r=0, t=30, b=0),
@@ -79,8 +198,8 @@ class FireProgression:
                 yanchor="middle",
                 y=0.5
             ),
-            width=1000,  # Set fixed width for the figure
-            height=600   # Ensure height is set in layout as well
+            width=MAP_WIDTH,  # Set fixed width for the figure
+            height=MAP_HEIGHT   # Ensure height is set in layout as well
         )
 
         # Update session state with current map view
@@ -92,7 +211,236 @@ class FireProgression:
             })
             
         return fig
-        
+
+    def get_map(self, selected_date, show_perimeters=False, show_arrival=False, events=(), show_energy=False):
+        """Map of hotspots up to ``selected_date``, served from the figure cache when possible.
+
+        ``events`` limits the hotspots to those fire event ids; ``show_energy``
+        underlays the cumulative fire radiative energy grid.
+        """
+        view = st.session_state.map_center
+        key = (self.data_loader.version, selected_date, view['lat'], view['lon'], view['zoom'],
+               show_perimeters, show_arrival, tuple(events), show_energy)
+        fig = figure_cache.get(key)
+        if fig is not None:
+            return fig
+
+        if events:
+            fig = self.create_map(self.data_loader.events_upto(selected_date, events), is_prefix=False)
+        else:
+            df = self.data_loader.time_index.upto(selected_date)
+            fig = (self.create_raster_map(selected_date) if len(df) > MAP_SETTINGS['RASTER_MIN_POINTS']
+                   else self.create_map(df))
+        if show_arrival:
+            self.add_arrival_time(fig)
+        if show_energy:
+            self.add_fire_energy(fig, selected_date)
+        if show_perimeters:
+            self.add_growth_rings(fig, selected_date)
+        figure_cache.put(key, fig)
+        return fig
+
+    def add_arrival_time(self, fig):
+        """Underlay the interpolated fire arrival-time surface as an image"""
+        spread = self.data_loader.spread
+        if spread is None:
+            return fig
+        key = (self.data_loader.version, 'arrival_time')
+        png = raster_cache.get(key)
+        if png is None:
+            png = to_png(colorize(spread.arrival, colormap_lut(px.colors.sequential.Viridis),
+                                  0, np.nanmax(spread.arrival)))
+            raster_cache.put(key, png)
+        west, south, east, north = (float(edge) for edge in spread.bounds)
+        layer = dict(sourcetype='image',
+                     source='data:image/png;base64,' + base64.b64encode(png).decode('ascii'),
+                     coordinates=[[west, north], [east, north], [east, south], [west, south]],
+                     below='traces')
+        fig.update_layout(mapbox_layers=[layer] + list(fig.layout.mapbox.layers))
+        return fig
+
+    def add_fire_energy(self, fig, selected_date):
+        """Underlay the fire radiative energy released per cell up to ``selected_date``, on a log scale"""
+        grid = self.data_loader.energy
+        key = (self.data_loader.version, 'fire_energy', selected_date)
+        png = raster_cache.get(key)
+        if png is None:
+            energy = grid.energy_upto(selected_date)
+            log_energy = np.log10(np.where(energy > 0, energy, np.nan))[::-1]  # row 0 at the north
+            vmax = np.nanmax(log_energy) if np.isfinite(log_energy).any() else 1.0
+            png = to_png(colorize(log_energy, colormap_lut(px.colors.sequential.YlOrRd), vmax - 4, vmax))
+            raster_cache.put(key, png)
+        west, south, east, north = (float(edge) for edge in grid.bounds)
+        layer = dict(sourcetype='image',
+                     source='data:image/png;base64,' + base64.b64encode(png).decode('ascii'),
+                     coordinates=[[west, north], [east, north], [east, south], [west, south]],
+                     below='traces')
+        fig.update_layout(mapbox_layers=[layer] + list(fig.layout.mapbox.layers))
+        return fig
+
+    def add_growth_rings(self, fig, selected_date):
+        """Outline the reconstructed cumulative perimeter of every day up to ``selected_date``"""
+        rings = self.data_loader.perimeters.growth_rings(selected_date)
+        days = list(rings.groupby('date', sort=True))
+        # Older rings lighter, the selected day's perimeter darkest
+        colors = px.colors.sample_colorscale(
+            px.colors.sequential.Purples, [0.3 + 0.7 * (i + 1) / len(days) for i in range(len(days))])
+        layers = [dict(sourcetype='geojson', source=perimeter_geojson(day_rings), type='line',
+                       color=color, line=dict(width=1.5), below='traces')
+                  for (_, day_rings), color in zip(days, colors, strict=True)]
+        fig.update_layout(mapbox_layers=list(fig.layout.mapbox.layers) + layers)
+        return fig
+
+    def render_raster(self, selected_date, bounds, width, height):
+        """PNG of the hotspots up to ``selected_date`` inside ``bounds``, cached per view and date"""
+        view = st.session_state.map_center
+        key = (self.data_loader.version, bounds, view['zoom'], selected_date)
+        png = raster_cache.get(key)
+        if png is None:
+            df = self.data_loader.df
+            stop = len(self.data_loader.time_index.upto(selected_date))
+            positions = self.data_loader.spatial_index.bbox_positions(bounds, stop)
+            # Gather the points in view before any dtype conversion
+            png = render_png(
+                df['latitude'].to_numpy()[positions],
+                df['longitude'].to_numpy()[positions],
+                df['brightness'].to_numpy()[positions],
+                bounds, width, height,
+                colormap_lut(px.colors.sequential.YlOrRd),
+                # Fixed over the whole dataset so colours don't shift between dates
+                *self.data_loader.brightness_range())
+            raster_cache.put(key, png)
+        return png
+
+    def create_raster_map(self, selected_date):
+        """Map with hotspots up to ``selected_date`` drawn as one server-rendered image overlay"""
+        view = st.session_state.map_center
+        margin = MAP_SETTINGS['RASTER_MARGIN']
+        west, south, east, north = bounds = tuple(
+            float(edge) for edge in viewport_bounds(view, view['zoom'], MAP_WIDTH, MAP_HEIGHT, margin))
+        width, height = round(MAP_WIDTH * (1 + 2 * margin)), round(MAP_HEIGHT * (1 + 2 * margin))
+        png = self.render_raster(selected_date, bounds, width, height)
+
+        vmin, vmax = self.data_loader.brightness_range()
+        fig = go.Figure(go.Scattermapbox(
+            # Empty trace that only carries the colour bar of the overlay
+            lat=[None], lon=[None], mode='markers', hoverinfo='skip', showlegend=False,
+            marker=dict(color=[vmin], coloraxis='coloraxis')
+        ))
+        fig.update_layout(
+            margin=dict(l=0, r=0, t=30, b=0),
+            mapbox=dict(
+                style="open-street-map", zoom=view['zoom'],
+                center={'lat': view['lat'], 'lon': view['lon']}, bearing=0, pitch=0,
+                layers=[dict(
+                    sourcetype='image',
+                    source='data:image/png;base64,' + base64.b64encode(png).decode('ascii'),
+                    coordinates=[[west, north], [east, north], [east, south], [west, south]],
+                    below='traces'
+                )]
+            ),
+            coloraxis=dict(
+                colorscale=px.colors.sequential.YlOrRd,
+                cmin=vmin,
+                cmax=vmax,
+                colorbar=dict(title="Max Brightness Temperature (K)", thickness=20, len=0.5,
+                              yanchor="middle", y=0.5)
+            ),
+            width=MAP_WIDTH,
+            height=MAP_HEIGHT
+        )
+        return fig
+
+    def create_animation(self, df):
+        """One figure with a frame per day that plays back entirely in the browser.
+
+        Each day's hotspots are sent once, as their own trace, and every frame
+        only toggles which of those traces are visible, so the payload grows
+        with the number of points rather than with points x frames. The last
+        frame shows every day at once, so ``LOD_MAX_POINTS`` is split over the
+        days by their share of the hotspots and each day past its share is
+        grid-aggregated as in ``create_map``.
+        """
+        view = st.session_state.map_center
+        time_index = self.data_loader.time_index
+        starts = time_index.offsets
+        labels = [pd.Timestamp(day).strftime('%m/%d/%Y') for day in time_index.days]
+        max_points = MAP_SETTINGS['LOD_MAX_POINTS']
+
+        traces = []
+        for start, stop, label in zip(starts[:-1], starts[1:], labels, strict=True):
+            day, aggregated = level_of_detail(
+                df.iloc[start:stop], view, view['zoom'], MAP_WIDTH, MAP_HEIGHT,
+                max(1, max_points * (stop - start) // max(len(df), 1)), MAP_SETTINGS['LOD_CELL_PIXELS'])
+            if aggregated:
+                customdata = day['count']
+                hovertemplate = ("hotspots=%{customdata:,}<br>latitude=%{lat:.2f}<br>"
+                                 "longitude=%{lon:.2f}<br>max brightness=%{marker.color:.1f}<extra></extra>")
+            else:
+                customdata = day['acq_datetime'].dt.strftime('%Y-%m-%d %H:%M')
+                hovertemplate = ("acq_datetime=%{customdata}<br>latitude=%{lat:.2f}<br>"
+                                 "longitude=%{lon:.2f}<br>brightness=%{marker.color:.1f}<extra></extra>")
+            traces.append(go.Scattermapbox(
+                lat=day['latitude'],
+                lon=day['longitude'],
+                mode='markers',
+                marker=dict(size=6, opacity=0.7, color=day['brightness'], coloraxis='coloraxis'),
+                customdata=customdata,
+                hovertemplate=hovertemplate,
+                name=label,
+                showlegend=False,
+                visible=len(traces) == 0,
+            ))
+
+        all_traces = list(range(len(traces)))
+        frames = [go.Frame(name=label, traces=all_traces,
+                           data=[{'visible': i <= k} for i in all_traces])
+                  for k, label in enumerate(labels)]
+        frame_args = {'mode': 'immediate', 'frame': {'duration': 0, 'redraw': True}, 'transition': {'duration': 0}}
+
+        fig = go.Figure(data=traces, frames=frames)
+        fig.update_layout(
+            margin=dict(l=0, r=0, t=30, b=0),
+            mapbox=dict(style="open-street-map", zoom=view['zoom'],
+                        center={'lat': view['lat'], 'lon': view['lon']}, bearing=0, pitch=0),
+            coloraxis=dict(
+                colorscale=px.colors.sequential.YlOrRd,
+                cmin=float(df['brightness'].min()),
+                cmax=float(df['brightness'].max()),
+                colorbar=dict(title="Brightness Temperature (K)", thickness=20, len=0.5,
+                              yanchor="middle", y=0.5)
+            ),
+            updatemenus=[dict(
+                type='buttons', direction='left', x=0, y=0, xanchor='left', yanchor='top',
+                pad=dict(t=40, r=10),
+                buttons=[
+                    dict(label='Play', method='animate',
+                         args=[None, {**frame_args, 'frame': {'duration': 500, 'redraw': True},
+                                      'fromcurrent': True}]),
+                    dict(label='Pause', method='animate', args=[[None], frame_args]),
+                ],
+            )],
+            sliders=[dict(
+                x=0.1, len=0.9, y=0, yanchor='top', pad=dict(t=30),
+                currentvalue=dict(prefix="Analysis Date: "),
+                steps=[dict(label=label, method='animate', args=[[label], frame_args]) for label in labels],
+            )],
+            width=1000,
+            height=650
+        )
+        return fig
+
+    def get_animation(self):
+        """The animated figure for the whole dataset, served from the figure cache when possible"""
+        view = st.session_state.map_center
+        key = (self.data_loader.version, 'animation', view['lat'], view['lon'], view['zoom'])
+        fig = figure_cache.get(key)
+        if fig is not None:
+            return fig
+
+        fig = self.create_animation(self.data_loader.df)
+        figure_cache.put(key, fig)
+        return fig
 
     def display(self):
         st.title("Los Angeles Wildfire Progression - January 2025")
@@ -104,22 +452,76 @@ class FireProgression:
 
             with col1:
                 st.subheader("Fire Progression Visualization")
-                date_min = df['acq_date'].min().date()
-                date_max = df['acq_date'].max().date()
+                mode = st.radio("Playback", ["Slider", "Animation"], horizontal=True,
+                                help="Animation plays back in the browser without reloading the page")
 
-                selected_date = st.slider(
-                    "Analysis Date",
-                    min_value=date_min,
-                    max_value=date_max,
-                    value=date_min,
-                    format="MM/DD/YYYY"
-                )
+                if mode == "Animation":
+                    fig = self.get_animation()
+                else:
+                    days = self.data_loader.time_index.days
+                    date_min = pd.Timestamp(days[0]).date()
+                    date_max = pd.Timestamp(days[-1]).date()
 
-                df_filtered = df[df['acq_date'].dt.date <= selected_date]
+                    selected_date = st.slider(
+                        "Analysis Date",
+                        min_value=date_min,
+                        max_value=date_max,
+                        value=date_min,
+                        format="MM/DD/YYYY"
+                    )
 
-                fig = self.create_map(df_filtered)
+                    show_perimeters = st.checkbox(
+                        "Show daily perimeters",
+                        help="Perimeters reconstructed from the hotspots, one ring per day up to the selected date")
+                    show_arrival = st.checkbox(
+                        "Show fire arrival time",
+                        help="When the fire reached each spot, interpolated from the hotspots (dark: earliest)")
+                    show_energy = st.checkbox(
+                        "Show fire radiative energy",
+                        help="FRP integrated over the satellite overpasses up to the selected date, per ~1 km cell "
+                             "(log scale, dark: most energy released)")
+                    # Events (and their energy) are only clustered once the filter is first used
+                    events = []
+                    if st.checkbox("Filter by fire event",
+                                   help="Fires told apart by clustering hotspots in space and time"):
+                        summary = self.data_loader.events
+                        energy = self.data_loader.event_energy if show_energy else None
+
+                        def event_label(event):
+                            label = (f"Event {event} - from {summary.at[event, 'first_seen']:%m/%d}, "
+                                     f"{summary.at[event, 'detections']:,} detections")
+                            if energy is not None:
+                                label += f", {energy.get(event, 0) / 1000:,.1f} TJ"
+                            return label
+
+                        events = st.multiselect("Fire events", options=list(summary.index), format_func=event_label,
+                                                help="Leave empty for all")
+                    fig = self.get_map(selected_date, show_perimeters, show_arrival, events, show_energy)
+
+                    cube = self.data_loader.cube
+                    view = st.session_state.map_center
+                    in_view = viewport_bounds(view, view['zoom'], MAP_WIDTH, MAP_HEIGHT, margin=0)
+                    st.caption(f"{cube.count(end=selected_date):,} detections up to {selected_date:%m/%d/%Y}, "
+                               f"{cube.count(in_view, end=selected_date):,} in view, "
+                               f"{cube.count(start=selected_date, end=selected_date):,} on the day")
                 st.plotly_chart(fig, use_container_width=True)
 
+                stats = figure_cache.stats()
+                st.caption(f"Map cache: {stats['hits']} hits, {stats['misses']} misses, "
+                           f"{stats['bytes'] / 1024 ** 2:,.1f} MiB")
+
+                with st.expander("Rate of spread by day"):
+                    # The expander body always runs, so only interpolate once asked to
+                    spread = self.data_loader.spread if st.checkbox("Compute rate of spread") else None
+                    if spread is not None:
+                        st.dataframe(spread.summary().rename(columns={
+                            'new_area_acres': 'Newly burned (acres)',
+                            'ros_median_kmh': 'Median spread (km/h)',
+                            'ros_p90_kmh': '90th pct spread (km/h)',
+                            'ros_max_kmh': 'Max spread (km/h)',
+                            'direction_deg': 'Heading (deg from N)',
+                        }).style.format(precision=2), use_container_width=True)
+
             with col2:
                 st.subheader("How Fire Progression is Tracked")
                 st.markdown("""
@@ -8,6 +8,8 @@ from PIL import Image
 from branca.colormap import LinearColormap
 from streamlit_folium import folium_static
 
+from data.registry import get_registry
+
 # Define burn severity classes with corresponding colors
 BURN_SEVERITY_CLASSES = {
     "Enhanced Regrowth, High": "#7a8737",
@@ -43,7 +45,11 @@ class InvasivesMap:
         ]
 
     def load_geojson_data(self, url):
-        """Generic function to load GeoJSON data from a URL and handle datetime issues."""
+        """Generic function to load GeoJSON data from a URL, shared read-only by every session."""
+        return get_registry().get_or_load(('invasives', url), lambda: self._read_geojson_data(url), owner=self)
+
+    def _read_geojson_data(self, url):
+        """Load GeoJSON data from a URL and handle datetime issues."""
         try:
             response = requests.get(url)
             response.raise_for_status()
@@ -95,8 +101,9 @@ class InvasivesMap:
             # Load and add invasive species layer
             gdf_invasives = self.load_geojson_data(self.INVASIVES_GEOJSON_URL)
             if gdf_invasives is not None:
-                # Add a new column "Source" with the fixed value "CALVEG"
-                gdf_invasives["Source"] = "CALVEG"
+                # Add a new column "Source" with the fixed value "CALVEG" (on a
+                # new frame, the loaded one is shared with other sessions)
+                gdf_invasives = gdf_invasives.assign(Source="CALVEG")
             
                 folium.GeoJson(
                     gdf_invasives,
@@ -6,6 +6,8 @@ from io import BytesIO
 from branca.colormap import LinearColormap
 from streamlit_folium import folium_static
 
+from data.registry import get_registry
+
 import plotly.graph_objects as go
 import plotly.express as px
 
@@ -138,6 +140,11 @@ class VegBurn:
         
 
     def load_vegetation_data(self):
+        # Parsed once per process and shared read-only by every session
+        return get_registry().get_or_load(('veg_burn', self.VEGETATION_GEOJSON_URL),
+                                          self._read_vegetation_data, owner=self)
+
+    def _read_vegetation_data(self):
         try:
             response = requests.get(self.VEGETATION_GEOJSON_URL)
             response.raise_for_status()
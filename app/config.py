@@ -8,7 +8,13 @@ MAP_SETTINGS = {
     'CENTER_LON': -118.3,
     'DEFAULT_ZOOM': 11,
     'DEFAULT_PITCH': 45,
-    'MAP_STYLE': "mapbox://styles/mapbox/satellite-v9"
+    'MAP_STYLE': "mapbox://styles/mapbox/satellite-v9",
+    'FIGURE_CACHE_MAX_BYTES': 64 * 1024 ** 2,
+    'LOD_MAX_POINTS': 20000,    # markers sent to the browser before hotspots are grid-aggregated
+    'LOD_CELL_PIXELS': 8,
+    'RASTER_MIN_POINTS': 1_000_000,  # above this, hotspots are drawn as a server-rendered image
+    'RASTER_MARGIN': 0.5,            # viewports rendered around the visible one, for panning
+    'RASTER_CACHE_MAX_BYTES': 64 * 1024 ** 2
 }
 
 # Color Schemes
@@ -35,6 +41,42 @@ DATA_SETTINGS = {
         'burn_severity': 300,
         'tree_species': 100,
         'infrastructure': 20
+    },
+    'CACHE': {              #    - on-disk cache for the GCS assets, LOCALSOLVE_CACHE_DIR overrides DIR
+        'DIR': '~/.cache/localsolve',
+        'MAX_BYTES': 1024 ** 3,
+        'REVALIDATE_SECONDS': 60 * 60,
+        'TTL_SECONDS': 30 * 24 * 60 * 60,
+        'SPOOL_MAX_BYTES': 32 * 1024 ** 2
+    },
+    'DEBUG': {              #    - TRACE_MEMORY measures load peaks with tracemalloc; slows every load, so dev only
+        'TRACE_MEMORY': False
+    },
+    'HOTSPOTS': {           #    - set MAX_MEMORY_BYTES to summarize burn severity in chunks under that ceiling
+        'MAX_MEMORY_BYTES': None,
+        'CUBE_CELL_DEGREES': 0.01,  # grid of the summed-area count/FRP cube, ~1 km
+        'CUBE_MAX_CELLS': 8 * 1024 ** 2  # cells per cube array (8 bytes each); coarser cells past that
+    },
+    'PERIMETERS': {         #    - daily perimeters reconstructed from hotspots
+        'cell_degrees': 0.0035,     # ~375 m, the VIIRS pixel size
+        'gap_cells': 2,             # burned cells this many cells apart belong to one fire
+        'concave_ratio': 0.3
+    },
+    'SPREAD': {             #    - arrival-time surface and rate of spread interpolated from hotspots
+        'cell_km': 0.2,
+        'neighbours': 8,            # detections used per cell by the inverse-distance weighting
+        'power': 2.0,
+        'max_distance_km': 0.75,    # cells further than this from any detection are unburned
+        'max_cells': 4 * 1024 ** 2  # coarser cells past this many
+    },
+    'EVENTS': {             #    - hotspots within distance_km and max_gap_hours of an event join it
+        'distance_km': 2.0,
+        'max_gap_hours': 72
+    },
+    'ENERGY': {             #    - cumulative fire radiative energy, FRP integrated over overpasses per cell
+        'cell_degrees': 0.01,       # ~1 km, coarse enough that a burning spot is re-detected in its cell
+        'max_gap_hours': 24,        # overpasses further apart than this start a new burning run
+        'isolated_hours': 6         # hours of burning a single overpass stands for
     }
 }
 
@@ -0,0 +1,292 @@
+"""
+On-disk cache for the remote assets used by the dashboard.
+
+Bodies are stored zstd-compressed under their SHA-256 digest, so identical
+files fetched from different URLs share one blob. An index maps each URL to
+its digest and to the validators (ETag / Last-Modified) returned by the
+server, which are replayed as a conditional request once an entry is older
+than the revalidation window. A warm start therefore either skips the
+network entirely or gets a bodiless ``304 Not Modified``.
+
+Bodies are handed out as file objects so they can be streamed straight into
+``pd.read_csv`` without materialising decoded copies of the payload.
+
+Several worker processes may share one cache directory. Index updates are
+merged with the on-disk index under an exclusive file lock, and only blobs
+this cache evicted itself, or orphans older than the TTL, are deleted, so
+one worker never removes a blob another has just written.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+import requests
+import requests.adapters
+import zstandard
+from config import DATA_SETTINGS
+
+# Cache hits only bump ``accessed_at``; write those to disk at most this often
+INDEX_FLUSH_SECONDS = 60
+
+
+class AssetCache:
+    def __init__(self, cache_dir=None, max_bytes=None, revalidate_seconds=None,
+                 ttl_seconds=None, spool_max_bytes=None, session=None):
+        settings = DATA_SETTINGS['CACHE']
+        cache_dir = cache_dir or os.environ.get('LOCALSOLVE_CACHE_DIR') or settings['DIR']
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_bytes = settings['MAX_BYTES'] if max_bytes is None else max_bytes
+        self.revalidate_seconds = (settings['REVALIDATE_SECONDS']
+                                   if revalidate_seconds is None else revalidate_seconds)
+        self.ttl_seconds = settings['TTL_SECONDS'] if ttl_seconds is None else ttl_seconds
+        self.spool_max_bytes = (settings['SPOOL_MAX_BYTES']
+                                if spool_max_bytes is None else spool_max_bytes)
+        self.session = session or make_session()
+        self.index_path = os.path.join(self.cache_dir, 'index.json')
+        self.lock_path = os.path.join(self.cache_dir, 'index.lock')
+        self._lock = threading.Lock()
+        self._flushed_at = time.time()
+        os.makedirs(os.path.join(self.cache_dir, 'objects'), exist_ok=True)
+        self.index = self._read_index()
+
+    def open(self, url, spool_max_bytes=None):
+        """Return a binary file object holding the body of ``url``.
+
+        Cached bodies are decompressed as they are read. Fresh downloads are
+        streamed chunk by chunk into the blob store and into a spooled
+        temporary file, which stays in memory below ``spool_max_bytes``
+        (default: the cache setting) and rolls over to disk above it, so the
+        full body is never held as one ``bytes`` object. Returns ``None`` when
+        the asset can neither be downloaded nor served from the cache.
+        """
+        with self._lock:
+            entry = self.index.get(url)
+        if entry is not None and not os.path.exists(self.blob_path(entry['digest'])):
+            entry = None
+
+        now = time.time()
+        if entry is not None and now - entry['checked_at'] < self.revalidate_seconds:
+            try:
+                return self._open_blob(url, entry)
+            except FileNotFoundError:
+                entry = None  # evicted by another worker since the check above
+
+        headers = {'Accept-Encoding': 'gzip'}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            response = self.session.get(url, headers=headers, stream=True)
+        except requests.RequestException as e:
+            if entry is None:
+                raise
+            print(f"Serving cached copy of {url} after network error: {e}")
+            return self._open_blob(url, entry)
+
+        with response:
+            if response.status_code == 304 and entry is not None:
+                entry['checked_at'] = now
+                return self._open_blob(url, entry)
+            if response.status_code != 200:
+                if entry is not None:
+                    print(f"Serving cached copy of {url}. Status code: {response.status_code}")
+                    return self._open_blob(url, entry)
+                print(f"Failed to fetch {url}. Status code: {response.status_code}")
+                return None
+            return self._store_stream(url, response, spool_max_bytes)
+
+    def fetch(self, url):
+        """Return the body of ``url`` as ``bytes``, or ``None`` if it is unavailable."""
+        f = self.open(url)
+        if f is None:
+            return None
+        with f:
+            return f.read()
+
+    def _store_stream(self, url, response, spool_max_bytes=None):
+        """Tee a streamed 200 response into the blob store and a spooled file."""
+        if spool_max_bytes is None:
+            spool_max_bytes = self.spool_max_bytes
+        spool = tempfile.SpooledTemporaryFile(max_size=spool_max_bytes)
+        hasher = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.cache_dir, 'objects'))
+        try:
+            with os.fdopen(fd, 'wb') as raw, zstandard.ZstdCompressor(level=3).stream_writer(raw) as writer:
+                # iter_content undoes the gzip transfer encoding chunk by chunk
+                for chunk in response.iter_content(chunk_size=1 << 20):
+                    hasher.update(chunk)
+                    writer.write(chunk)
+                    spool.write(chunk)
+        except BaseException:
+            spool.close()
+            os.remove(tmp_path)
+            raise
+
+        digest = hasher.hexdigest()
+        path = self.blob_path(digest)
+        now = time.time()
+        with self._lock:
+            # Publish under the lock so a concurrent eviction can't see it as orphaned
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+            self.index[url] = {
+                'digest': digest,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'size': os.path.getsize(path),
+                'length': spool.tell(),
+                'checked_at': now,
+                'accessed_at': now,
+            }
+            self._sync_index(evict=True)
+        spool.seek(0)
+        return spool
+
+    def digest(self, url):
+        """Return the content digest currently cached for ``url``, if any."""
+        with self._lock:
+            entry = self.index.get(url)
+        return entry['digest'] if entry else None
+
+    def current_digest(self, url):
+        """Revalidate ``url`` as ``open`` would and return the digest of its current body.
+
+        Within the revalidation window this only opens the cached blob.
+        Returns ``None`` when the asset is unavailable.
+        """
+        f = self.open(url)
+        if f is None:
+            return None
+        f.close()
+        return self.digest(url)
+
+    def blob_path(self, digest):
+        return os.path.join(self.cache_dir, 'objects', digest[:2], f"{digest}.zst")
+
+    def _open_blob(self, url, entry):
+        f = open(self.blob_path(entry['digest']), 'rb')
+        with self._lock:
+            entry['accessed_at'] = time.time()
+            self.index[url] = entry
+            if entry['accessed_at'] - self._flushed_at > INDEX_FLUSH_SECONDS:
+                self._sync_index()
+        return zstandard.ZstdDecompressor().stream_reader(f)
+
+    def _sync_index(self, evict=False):
+        """Merge the in-memory index with the on-disk one (newest entry per URL wins) and write it back.
+
+        Runs under ``self._lock`` and the cross-process file lock, so entries
+        written by other workers are kept rather than overwritten.
+        """
+        with self._file_lock():
+            for url, theirs in self._read_index().items():
+                ours = self.index.get(url)
+                if ours is None or theirs['checked_at'] > ours['checked_at']:
+                    if ours is not None:
+                        theirs['accessed_at'] = max(theirs['accessed_at'], ours['accessed_at'])
+                    self.index[url] = theirs
+                else:
+                    ours['accessed_at'] = max(theirs['accessed_at'], ours['accessed_at'])
+            if evict:
+                self._evict()
+            self._write_index()
+            self._flushed_at = time.time()
+
+    def _evict(self):
+        """Drop entries past their TTL, then least recently used ones over the size budget."""
+        now = time.time()
+        evicted = set()
+        for url in [u for u, e in self.index.items() if now - e['accessed_at'] > self.ttl_seconds]:
+            evicted.add(self.index.pop(url)['digest'])
+
+        # Blobs are shared between URLs with identical content, so size by digest
+        sizes = {e['digest']: e['size'] for e in self.index.values()}
+        total = sum(sizes.values())
+        for url, entry in sorted(self.index.items(), key=lambda item: item[1]['accessed_at']):
+            if total <= self.max_bytes:
+                break
+            del self.index[url]
+            evicted.add(entry['digest'])
+            if all(e['digest'] != entry['digest'] for e in self.index.values()):
+                total -= sizes[entry['digest']]
+
+        # Unindexed blobs may belong to a worker that hasn't written its index
+        # entry yet; only remove them once they are older than the TTL
+        live = {e['digest'] for e in self.index.values()}
+        objects_dir = os.path.join(self.cache_dir, 'objects')
+        for root, _, files in os.walk(objects_dir):
+            for name in files:
+                digest = name[:-len('.zst')]
+                if not name.endswith('.zst') or digest in live:
+                    continue
+                path = os.path.join(root, name)
+                with contextlib.suppress(FileNotFoundError):
+                    if digest in evicted or now - os.path.getmtime(path) > self.ttl_seconds:
+                        os.remove(path)
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self):
+        self._atomic_write(self.index_path, json.dumps(self.index).encode('utf-8'))
+
+    def _atomic_write(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+def make_session(pool_size=8):
+    """Return a keep-alive session whose connection pool fits ``pool_size`` parallel fetches."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_asset_cache():
+    """Return the process-wide ``AssetCache`` built from ``DATA_SETTINGS['CACHE']``."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = AssetCache()
+        return _default_cache
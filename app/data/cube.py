@@ -0,0 +1,179 @@
+"""
+Summed-area cube of hotspot counts and FRP over (day, grid row, grid col).
+
+Detections are binned once onto a regular lon/lat grid per calendar day and
+the bins are prefix-summed along all three axes. The number of detections
+(or total FRP) in any grid-aligned box between any two days is then an
+eight-term inclusion-exclusion over the cube, O(1) regardless of how many
+rows the table holds. Boxes are half-open, ``west <= lon < east`` and
+``south <= lat < north``; edges that don't line up with the grid are snapped
+outwards to whole cells, so counts are exact to the cell size.
+
+Cells are addressed by absolute index, ``floor(lon / cell_degrees)``, as in
+the perimeter and energy grids, so grid-aligned edges map onto the same cell
+boundaries whatever the extent of the data. Values within ``SNAP_CELLS`` of a
+cell boundary are treated as lying on it, so floating-point noise in an edge
+such as ``-118.45 / 0.01`` doesn't push it one cell outward.
+
+The cube is dense, so its size grows with days x extent. When the requested
+cells would exceed ``max_cells`` (e.g. detections spread over a continent),
+the cell size is doubled until it fits.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Fraction of a cell within which a coordinate counts as on a cell boundary
+SNAP_CELLS = 1e-6
+
+# Bumped when the persisted layout changes, so older snapshots are rebuilt
+CUBE_FORMAT = 2
+
+
+def cell_index(values, cell_degrees, round_up=False):
+    """Absolute grid index of the cells holding ``values`` (or of the next boundary, with ``round_up``)"""
+    scaled = np.asarray(values, dtype=np.float64) / cell_degrees
+    nearest = np.round(scaled)
+    scaled = np.where(np.abs(scaled - nearest) < SNAP_CELLS, nearest, scaled)
+    return (np.ceil(scaled) if round_up else np.floor(scaled)).astype(np.int64)
+
+
+class HotspotCube:
+    def __init__(self, origin, cell_degrees, days, cum_count, cum_frp):
+        """Wrap prefix-summed arrays; use ``HotspotCube.build`` to make one from hotspots"""
+        self.origin = origin  # absolute (row, col) of cell [0, 0]
+        self.cell_degrees = cell_degrees
+        self.days = days
+        # cum_*[t, r, c]: sum over days <= t, rows < r and cols < c
+        self.cum_count = cum_count
+        self.cum_frp = cum_frp
+
+    @property
+    def shape(self):
+        """(days, rows, cols) of the underlying grid"""
+        t, r, c = self.cum_count.shape
+        return t, r - 1, c - 1
+
+    @property
+    def cells(self):
+        """Number of entries in each prefix-summed array"""
+        return self.cum_count.size
+
+    @classmethod
+    def build(cls, df, cell_degrees, max_cells=None):
+        """Bin time-stamped hotspots (``acq_date``, ``latitude``, ``longitude``, ``frp``).
+
+        With ``max_cells``, ``cell_degrees`` is doubled until the cube has at
+        most that many cells per array (or the grid is down to 2 x 2 cells).
+        """
+        if df.empty:
+            return cls((0, 0), cell_degrees, np.array([], dtype='datetime64[D]'),
+                       np.zeros((0, 1, 1), dtype=np.int64), np.zeros((0, 1, 1)))
+        lon = df['longitude'].to_numpy(np.float64)
+        lat = df['latitude'].to_numpy(np.float64)
+        days, day_index = np.unique(df['acq_date'].to_numpy('datetime64[D]'), return_inverse=True)
+        requested = cell_degrees
+        while True:
+            rows = cell_index(lat, cell_degrees)
+            cols = cell_index(lon, cell_degrees)
+            origin = (int(rows.min()), int(cols.min()))
+            n_rows = int(rows.max()) - origin[0] + 1
+            n_cols = int(cols.max()) - origin[1] + 1
+            if max_cells is None or len(days) * (n_rows + 1) * (n_cols + 1) <= max_cells:
+                break
+            if n_rows <= 2 and n_cols <= 2:  # any extent fits 2 x 2 cells, so coarser won't help
+                break
+            cell_degrees *= 2
+        if cell_degrees != requested:
+            print(f"Hotspot cube coarsened from {requested} to {cell_degrees} degree cells "
+                  f"to stay within {max_cells:,} cells")
+        rows -= origin[0]
+        cols -= origin[1]
+
+        keys = (day_index * n_rows + rows) * n_cols + cols
+        size = len(days) * n_rows * n_cols
+        frp = df['frp'].to_numpy(np.float64) if 'frp' in df else np.zeros(len(df))
+
+        def summed(weights, dtype):
+            bins = np.bincount(keys, weights=weights, minlength=size).reshape(len(days), n_rows, n_cols)
+            cum = np.zeros((len(days), n_rows + 1, n_cols + 1), dtype=dtype)
+            cum[:, 1:, 1:] = bins.cumsum(axis=0).cumsum(axis=1).cumsum(axis=2)
+            return cum
+
+        return cls(origin, cell_degrees, days, summed(None, np.int64), summed(np.nan_to_num(frp), np.float64))
+
+    def count(self, bounds=None, start=None, end=None):
+        """Detections in ``bounds`` (default: everywhere) on days in [``start``, ``end``]"""
+        return int(self._box_sum(self.cum_count, bounds, start, end))
+
+    def frp(self, bounds=None, start=None, end=None):
+        """Total fire radiative power (MW) in ``bounds`` on days in [``start``, ``end``]"""
+        return float(self._box_sum(self.cum_frp, bounds, start, end))
+
+    def daily_counts(self, bounds=None):
+        """Detections per day inside ``bounds``, as a Series indexed by day"""
+        r0, r1, c0, c1 = self._cells(bounds)
+        cum = self.cum_count
+        totals = cum[:, r1, c1] - cum[:, r0, c1] - cum[:, r1, c0] + cum[:, r0, c0]
+        return pd.Series(np.diff(totals, prepend=0), index=pd.DatetimeIndex(self.days), name='count')
+
+    def to_arrays(self):
+        """Plain arrays for persisting the cube (see ``from_arrays``)"""
+        return {'origin': np.array(self.origin, dtype=np.int64), 'cell_degrees': np.array(self.cell_degrees),
+                'days': self.days, 'cum_count': self.cum_count, 'cum_frp': self.cum_frp}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(tuple(int(i) for i in arrays['origin']), float(arrays['cell_degrees']), arrays['days'],
+                   arrays['cum_count'], arrays['cum_frp'])
+
+    def _box_sum(self, cum, bounds, start, end):
+        if len(self.days) == 0:
+            return 0
+        t1 = self._day_index(end, len(self.days) - 1)
+        t0 = self._day_index(start, -1, before=True)
+        if t1 < 0 or t1 <= t0:
+            return 0
+        r0, r1, c0, c1 = self._cells(bounds)
+
+        def upto(t):
+            if t < 0:
+                return 0
+            return cum[t, r1, c1] - cum[t, r0, c1] - cum[t, r1, c0] + cum[t, r0, c0]
+
+        return upto(t1) - upto(t0)
+
+    def _day_index(self, date, default, before=False):
+        """Last cube day on or before ``date`` (strictly before, with ``before``)"""
+        if date is None:
+            return default
+        day = np.datetime64(pd.Timestamp(date).date(), 'D')
+        return int(np.searchsorted(self.days, day, side='left' if before else 'right')) - 1
+
+    def _cells(self, bounds):
+        _, n_rows, n_cols = self.shape
+        if bounds is None:
+            return 0, n_rows, 0, n_cols
+        west, south, east, north = bounds
+        cell = self.cell_degrees
+        row, col = self.origin
+        c0 = int(np.clip(cell_index(west, cell) - col, 0, n_cols))
+        c1 = int(np.clip(cell_index(east, cell, round_up=True) - col, c0, n_cols))
+        r0 = int(np.clip(cell_index(south, cell) - row, 0, n_rows))
+        r1 = int(np.clip(cell_index(north, cell, round_up=True) - row, r0, n_rows))
+        return r0, r1, c0, c1
+
+
+def load_or_build_cube(snapshots, name, digest, df, cell_degrees, max_cells=None):
+    """The persisted cube of ``name`` for ``digest``, building and saving it on a miss.
+
+    Cubes still over ``max_cells`` after coarsening are not persisted.
+    """
+    settings = np.array([cell_degrees, np.inf if max_cells is None else max_cells, CUBE_FORMAT])
+    arrays = snapshots.load_arrays(name, digest)
+    if arrays is not None and 'settings' in arrays and np.array_equal(arrays['settings'], settings):
+        return HotspotCube.from_arrays(arrays)
+    cube = HotspotCube.build(df, cell_degrees, max_cells)
+    if not df.empty and (max_cells is None or cube.cells <= max_cells):
+        snapshots.save_arrays(name, digest, {**cube.to_arrays(), 'settings': settings})
+    return cube
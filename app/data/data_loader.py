@@ -1,32 +1,277 @@
 import pandas as pd
 import numpy as np
-import requests
-import io
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from io import StringIO
+
+from config import DATA_SETTINGS
+from data.cache import get_asset_cache
+from data.cube import load_or_build_cube
+from data.energy import EnergyGrid, accumulate_energy, event_energy
+from data.events import cluster_hotspots, event_summary
+from data.hotspots import normalize_hotspots
+from data.perimeters import PerimeterEngine
+from data.registry import get_registry, session_id
+from data.severity import (
+    SEVERITY_LABELS,
+    SeverityStore,
+    aggregate_hotspot_chunks,
+    read_summary_chunks,
+)
+from data.snapshots import SnapshotStore
+from data.spread import SpreadSurface
+from data.spatial_index import QuadkeyIndex
+from data.time_index import TimeIndex, sort_by_time
+
+ASSET_BASE_URL = "https://storage.googleapis.com/localsolve_assets/la_wildfires_jan_2025"
+
+# Remote CSVs loaded into DataLoader attributes of the same name
+REMOTE_ASSETS = {
+    "fire_hotspots": f"{ASSET_BASE_URL}/filtered_la_january_2025_fire_hotspots_combined.csv",
+    "veg_processed": f"{ASSET_BASE_URL}/Vegeation_withburn_mode_processed.csv",
+    "trees_withburn": f"{ASSET_BASE_URL}/LATreeswithburn_new.csv",
+    "trees_processed": f"{ASSET_BASE_URL}/LATrees_processed.csv",
+}
+
+# Remote assets each loader's results are derived from; their digests are
+# part of the loader's registry key, so a revalidated CSV is loaded afresh
+LOADER_ASSETS = {
+    "load_fire_hotspots": ("fire_hotspots",),
+    "load_vegetation_data": ("veg_processed", "trees_withburn", "trees_processed"),
+    "load_dates": ("fire_hotspots",),
+    "index_fire_hotspots": ("fire_hotspots",),
+    "build_hotspot_cube": ("fire_hotspots",),
+    "build_fire_perimeters": ("fire_hotspots",),
+    "cluster_fire_events": ("fire_hotspots",),
+    "build_fire_energy": ("fire_hotspots",),
+    "build_fire_spread": ("fire_hotspots",),
+    "generate_burn_severity": ("fire_hotspots",),
+}
+
+# One background pool per process: Streamlit builds a DataLoader on every rerun
+_prefetch_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='prefetch')
+_prefetches = {}  # (cache dir, loader) -> future of the process's prefetch, resolving to its registry key
+_prefetches_lock = threading.Lock()
+
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def max_rss_bytes():
+    """Peak resident set size of the process so far (0 where unsupported)"""
+    if resource is None:
+        return 0
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+
+@contextmanager
+def peak_memory(trace=None):
+    """Track how much the memory peak grew inside the block.
+
+    Yields a dict whose ``peak_bytes`` is filled in on exit. By default this
+    is the growth of the process's peak RSS, which costs nothing but is
+    process-wide and stays 0 when an earlier peak was higher. With ``trace``
+    (default: ``DATA_SETTINGS['DEBUG']['TRACE_MEMORY']``) it is the peak
+    Python/NumPy heap from tracemalloc instead; that slows every allocation
+    in the process, so it is meant for profiling only. Overlapping traced
+    uses (e.g. concurrent prefetches) share one trace, so each reports the
+    process-wide peak seen while it was open.
+    """
+    global _tracing_users
+    result = {'peak_bytes': 0}
+    if not (DATA_SETTINGS['DEBUG']['TRACE_MEMORY'] if trace is None else trace):
+        start_rss = max_rss_bytes()
+        try:
+            yield result
+        finally:
+            result['peak_bytes'] = max(max_rss_bytes() - start_rss, 0)
+        return
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing_users += 1
+        start_size, _ = tracemalloc.get_traced_memory()
+    try:
+        yield result
+    finally:
+        with _tracing_lock:
+            _, peak = tracemalloc.get_traced_memory()
+            result['peak_bytes'] = max(peak - start_size, 0)
+            _tracing_users -= 1
+            if _tracing_users == 0:
+                tracemalloc.stop()
+
+
+class LazyDataset:
+    """Attribute that is loaded by ``loader`` the first time it is read.
+
+    ``loader`` names a DataLoader method that assigns the attribute (and
+    possibly its siblings). Loaders run once per process through the shared
+    dataset registry; once assigned, the instance attribute shadows this
+    descriptor, so later reads are plain attribute lookups.
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        with instance._loader_lock(self.loader):
+            if self.name not in instance.__dict__:
+                instance._load_shared(self.loader)
+        return instance.__dict__[self.name]
+
 
 class DataLoader:
-    def __init__(self):
-        self.load_data()
+    fire_hotspots = LazyDataset('load_fire_hotspots')
+    veg_processed = LazyDataset('load_vegetation_data')
+    trees_withburn = LazyDataset('load_vegetation_data')
+    trees_processed = LazyDataset('load_vegetation_data')
+    infrastructure = LazyDataset('load_infrastructure')
+    severity_store = LazyDataset('generate_burn_severity')
+    tree_species = LazyDataset('load_tree_species')
+    dates = LazyDataset('load_dates')
+    hotspot_index = LazyDataset('index_fire_hotspots')
+    hotspot_spatial_index = LazyDataset('index_fire_hotspots')
+    hotspot_cube = LazyDataset('build_hotspot_cube')
+    fire_perimeters = LazyDataset('build_fire_perimeters')
+    fire_spread = LazyDataset('build_fire_spread')
+    fire_event_ids = LazyDataset('cluster_fire_events')
+    fire_events = LazyDataset('cluster_fire_events')
+    fire_energy = LazyDataset('build_fire_energy')
+    fire_event_energy = LazyDataset('build_fire_energy')
+
+    def __init__(self, cache=None, registry=None, max_memory_bytes=None):
+        self.max_memory_bytes = (DATA_SETTINGS['HOTSPOTS']['MAX_MEMORY_BYTES']
+                                 if max_memory_bytes is None else max_memory_bytes)
+        self.cache = cache or get_asset_cache()
+        self.registry = registry or get_registry()
+        self.snapshots = SnapshotStore(os.path.join(self.cache.cache_dir, 'snapshots'))
+        self.session_id = session_id()
+        self.load_timings = {}
+        self._versions = {}  # asset name -> digest this session's datasets are built from
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    @classmethod
+    def datasets(cls):
+        """Return the names of all lazily loaded dataset attributes"""
+        return [name for name, value in vars(cls).items() if isinstance(value, LazyDataset)]
+
+    def asset_version(self, name):
+        """Digest of the remote asset ``name`` this session's datasets are built from"""
+        return self._asset_versions([name])[0]
+
+    def prefetch(self, *names):
+        """Start loading the given datasets (default: all) in the background.
+
+        Returns one future per distinct loader. Each loader is prefetched
+        once per process on a shared pool; later calls (e.g. from the next
+        rerun's DataLoader) get the same future, unless that load failed and
+        left nothing in the registry (or only a superseded version). Reading an attribute while its
+        prefetch is running simply waits for it to finish.
+        """
+        names = names or self.datasets()
+        loaders = []
+        for name in names:
+            loader = vars(type(self))[name].loader
+            if name not in self.__dict__ and loader not in loaders:
+                loaders.append(loader)
+        futures = []
+        with _prefetches_lock:
+            for loader in loaders:
+                key = (self.cache.cache_dir, loader)
+                future = _prefetches.get(key)
+                if future is None or (future.done() and (future.exception() is not None
+                                                         or future.result() not in self.registry)):
+                    future = _prefetches[key] = _prefetch_pool.submit(self._run_loader, loader)
+                futures.append(future)
+        return futures
+
+    def _run_loader(self, loader):
+        with self._loader_lock(loader):
+            if any(name not in self.__dict__ for name in self._loader_datasets(loader)):
+                return self._load_shared(loader)
+            return self._registry_key(loader)
+
+    def _load_shared(self, loader):
+        """Attach the process-wide, read-only results of ``loader`` to this session.
+
+        Only the first session in the process actually runs the loader; the
+        rest reuse its frames through the registry. Results are keyed by the
+        versions of the assets they derive from, and older versions are
+        dropped from the registry once a newer one has loaded. Returns the
+        registry key.
+        """
+        names = self._loader_datasets(loader)
+        key = self._registry_key(loader)
+
+        def load():
+            getattr(self, loader)()
+            values = {name: self.__dict__[name] for name in names}
+            # Keep a failed download private to this session so the next one retries
+            if any(name in REMOTE_ASSETS and values[name].empty for name in names):
+                return None
+            return values
+
+        shared = self.registry.get_or_load(key, load, owner=self)
+        if shared is not None:
+            self.__dict__.update(shared)
+            self.registry.discard(lambda other: other[:2] == key[:2] and other != key)
+        return key
+
+    def _registry_key(self, loader):
+        """``(cache dir, loader, digests of the assets it derives from)``"""
+        return (self.cache.cache_dir, loader, self._asset_versions(LOADER_ASSETS.get(loader, ())))
+
+    def _asset_versions(self, names):
+        """Digests of the given remote assets, revalidated once and then pinned for this session.
+
+        Pinning keeps every dataset of a session built from the same bodies
+        even if an asset is revalidated in between.
+        """
+        with self._locks_guard:
+            missing = [name for name in names if name not in self._versions]
+        if missing:
+            with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+                digests = pool.map(lambda name: self.cache.current_digest(REMOTE_ASSETS[name]), missing)
+                for name, digest in zip(missing, digests, strict=True):
+                    with self._locks_guard:
+                        self._versions.setdefault(name, digest)
+        with self._locks_guard:
+            return tuple(self._versions[name] for name in names)
+
+    def _loader_datasets(self, loader):
+        return [name for name, value in vars(type(self)).items()
+                if isinstance(value, LazyDataset) and value.loader == loader]
+
+    def _loader_lock(self, loader):
+        with self._locks_guard:
+            return self._locks.setdefault(loader, threading.RLock())
 
     def load_data(self):
         """Load all required datasets"""
-        # Load fire hotspot data
-        self.load_fire_hotspots()
-        
-        # Load processed vegetation and tree data
-        self.load_vegetation_data()
-        
-        # Load infrastructure data
-        self.load_infrastructure()
-        
-        # Generate burn severity from fire hotspots
-        self.generate_burn_severity()
-        
-        # Load/generate tree species data
-        self.load_tree_species()
-        
-        # Set date range based on actual fire data
+        for future in self.prefetch():
+            future.result()
+
+    def load_dates(self):
+        """Set date range based on actual fire data"""
         if hasattr(self, 'fire_hotspots') and not self.fire_hotspots.empty:
             self.dates = pd.date_range(
                 start=self.fire_hotspots['acq_date'].min(),
@@ -35,64 +280,169 @@ class DataLoader:
         else:
             self.dates = pd.date_range(start='2024-01-20', end='2024-02-03')
 
-    def load_fire_hotspots(self):
-        """Load fire hotspot data from GCS"""
-        CSV_URL = "https://storage.googleapis.com/localsolve_assets/la_wildfires_jan_2025/filtered_la_january_2025_fire_hotspots_combined.csv"
-        
+    def load_remote_assets(self, names=None):
+        """Fetch remote CSVs concurrently, parsing each one as soon as it arrives.
+
+        All downloads share the cache's keep-alive session, so cold-start
+        latency is bounded by the largest file rather than the sum of all of
+        them. Per-asset fetch/parse timings and how much the memory peak grew
+        while loading (see ``peak_memory``) are kept in ``self.load_timings``.
+        """
+        names = list(REMOTE_ASSETS) if names is None else list(names)
+
+        started = time.perf_counter()
+        with peak_memory() as memory:
+            with ThreadPoolExecutor(max_workers=len(names)) as pool:
+                futures = {pool.submit(self._load_remote_asset, name): name for name in names}
+                for future in as_completed(futures):
+                    name = futures[future]
+                    df, timing = future.result()
+                    setattr(self, name, df)
+                    self.load_timings[name] = timing
+                    print(f"Loaded {name} from {timing.get('source', 'nothing')}: {timing['bytes']:,} bytes, "
+                          f"fetch {timing['fetch_s']:.2f}s, parse {timing['parse_s']:.2f}s")
+        self.load_timings['total_s'] = time.perf_counter() - started
+        self.load_timings['peak_bytes'] = memory['peak_bytes']
+        print(f"Loaded {len(names)} assets in {self.load_timings['total_s']:.2f}s, "
+              f"peak memory {memory['peak_bytes'] / 1024 ** 2:,.1f} MiB")
+
+    def _load_remote_asset(self, name):
+        """Fetch and parse one entry of ``REMOTE_ASSETS``; runs on a worker thread."""
+        url = REMOTE_ASSETS[name]
+        timing = {'fetch_s': 0.0, 'parse_s': 0.0, 'bytes': 0}
         try:
-            response = requests.get(CSV_URL)
-            if response.status_code == 200:
-                csv_data = response.content
-                self.fire_hotspots = pd.read_csv(io.StringIO(csv_data.decode("utf-8")))
-                self.fire_hotspots['acq_date'] = pd.to_datetime(self.fire_hotspots['acq_date'])
-                self.fire_hotspots['acq_datetime'] = self.fire_hotspots['acq_date'] + pd.to_timedelta(
-                    self.fire_hotspots['acq_time'].astype(str).str.zfill(4).str[:2] + ':' + 
-                    self.fire_hotspots['acq_time'].astype(str).str.zfill(4).str[2:] + ':00'
-                )
-            else:
-                print(f"Failed to load fire hotspot data. Status code: {response.status_code}")
-                self.fire_hotspots = pd.DataFrame()
+            started = time.perf_counter()
+            csv_file = self.cache.open(url)
+            timing['fetch_s'] = time.perf_counter() - started
+            if csv_file is None:
+                print(f"Failed to fetch {name} data from {url}")
+                return pd.DataFrame(), timing
+
+            started = time.perf_counter()
+            digest = self.cache.digest(url)
+            df = self.snapshots.load(name, digest)
+            if df is not None:
+                csv_file.close()
+                timing['source'] = 'snapshot'
+                timing['parse_s'] = time.perf_counter() - started
+                return df, timing
+
+            # The parser pulls the body from the file object in small chunks,
+            # so no decoded copy of the whole payload is ever built
+            with csv_file:
+                df = pd.read_csv(csv_file)
+                timing['bytes'] = csv_file.tell()
+            if name == 'fire_hotspots':
+                df = self._prepare_fire_hotspots(df)
+            self.snapshots.save(name, digest, df)
+            timing['source'] = 'csv'
+            timing['parse_s'] = time.perf_counter() - started
+            return df, timing
         except Exception as e:
-            print(f"Error loading fire hotspot data: {str(e)}")
-            self.fire_hotspots = pd.DataFrame()
+            print(f"Error loading {name} data: {str(e)}")
+            return pd.DataFrame(), timing
+
+    def load_fire_hotspots(self):
+        """Load fire hotspot data from GCS"""
+        self.load_remote_assets(['fire_hotspots'])
+
+    def _prepare_fire_hotspots(self, df):
+        """Normalize raw hotspot rows and sort them by acquisition time"""
+        # Keep rows in time order so date cutoffs are positional slices
+        return sort_by_time(normalize_hotspots(df), 'acq_datetime')
+
+    def index_fire_hotspots(self):
+        """Build the day-boundary and quadkey indexes over the time-sorted fire hotspots"""
+        self.hotspot_index = TimeIndex(self.fire_hotspots, 'acq_datetime')
+        self.hotspot_spatial_index = QuadkeyIndex(self.fire_hotspots)
+
+    def build_hotspot_cube(self):
+        """Load the summed-area count/FRP cube of the fire hotspots, building it on first use"""
+        self.hotspot_cube = load_or_build_cube(
+            self.snapshots, 'fire_hotspots_cube', self.asset_version('fire_hotspots'),
+            self.fire_hotspots, DATA_SETTINGS['HOTSPOTS']['CUBE_CELL_DEGREES'],
+            DATA_SETTINGS['HOTSPOTS']['CUBE_MAX_CELLS'])
+
+    def build_fire_perimeters(self):
+        """Reconstruct the daily cumulative fire perimeters from the fire hotspots"""
+        self.fire_perimeters = PerimeterEngine.from_hotspots(self.fire_hotspots, **DATA_SETTINGS['PERIMETERS'])
+
+    def cluster_fire_events(self):
+        """Group the fire hotspots into fire events; ``fire_event_ids`` is aligned with ``fire_hotspots``"""
+        self.fire_event_ids = cluster_hotspots(self.fire_hotspots, **DATA_SETTINGS['EVENTS'])
+        self.fire_events = event_summary(self.fire_hotspots, self.fire_event_ids)
+
+    def build_fire_energy(self):
+        """Accumulate the fire radiative energy grid day by day, with totals per fire event"""
+        self.fire_energy = EnergyGrid(**DATA_SETTINGS['ENERGY'])
+        contributions = accumulate_energy(self.fire_hotspots, self.fire_energy)
+        self.fire_event_energy = event_energy(self.fire_event_ids.to_numpy(), contributions.to_numpy())
+
+    def build_fire_spread(self):
+        """Interpolate the fire arrival-time surface and rate of spread from the fire hotspots"""
+        self.fire_spread = (SpreadSurface.from_hotspots(self.fire_hotspots, **DATA_SETTINGS['SPREAD'])
+                            if not self.fire_hotspots.empty else None)
 
     def generate_burn_severity(self):
-        """Generate burn severity data from fire hotspots"""
+        """Generate burn severity data from fire hotspots.
+
+        With ``max_memory_bytes`` set, the hotspot CSV is streamed in chunks
+        that fit the ceiling and only the per-day aggregates are kept, so
+        archives larger than RAM still produce the same summary (but no
+        per-row ``burn_severity`` table).
+        """
+        if self.max_memory_bytes is not None:
+            # Spill a fresh download to disk early so it doesn't blow the ceiling
+            csv_file = self.cache.open(REMOTE_ASSETS['fire_hotspots'],
+                                       spool_max_bytes=self.max_memory_bytes // 4)
+            if csv_file is not None:
+                with csv_file:
+                    self.severity_store = aggregate_hotspot_chunks(
+                        read_summary_chunks(csv_file, self.max_memory_bytes))
+                return
+
+        self.severity_store = SeverityStore()
         if hasattr(self, 'fire_hotspots') and not self.fire_hotspots.empty:
-            # Map brightness to severity levels
-            brightness_ranges = {
-                'High': (350, float('inf')),
-                'Medium': (325, 350),
-                'Low': (0, 325)
-            }
-            
-            # Create severity column based on brightness
-            severity = pd.cut(
-                self.fire_hotspots['brightness'],
-                bins=[-float('inf'), 325, 350, float('inf')],
-                labels=['Low', 'Medium', 'High']
-            )
-            
-            # Calculate approximate area from scan and track
-            # This is a simplified calculation - adjust based on your needs
-            area_acres = self.fire_hotspots['scan'] * self.fire_hotspots['track'] * 0.000247105  # Convert m² to acres
-            
-            self.burn_severity = pd.DataFrame({
-                'severity': severity,
-                'latitude': self.fire_hotspots['latitude'],
-                'longitude': self.fire_hotspots['longitude'],
-                'area_acres': area_acres,
-                'date': self.fire_hotspots['acq_date']
-            })
+            self.severity_store.append_hotspots(self.fire_hotspots)
         else:
             # Fallback to mock data if no fire hotspots available
-            self.burn_severity = pd.DataFrame({
-                'severity': ['High', 'Medium', 'Low'] * 100,
-                'latitude': np.random.uniform(34.0, 34.2, 300),
-                'longitude': np.random.uniform(-118.4, -118.2, 300),
-                'area_acres': np.random.uniform(10, 100, 300),
-                'date': pd.date_range(start='2024-01-20', end='2024-02-03').repeat(100)[:300]
-            })
+            self.severity_store.append(
+                codes=np.tile(np.arange(len(SEVERITY_LABELS), dtype=np.int8)[::-1], 100),
+                latitude=np.random.uniform(34.0, 34.2, 300),
+                longitude=np.random.uniform(-118.4, -118.2, 300),
+                area_acres=np.random.uniform(10, 100, 300),
+                dates=pd.date_range(start='2024-01-20', end='2024-02-03').repeat(100)[:300].to_numpy('datetime64[us]')
+            )
+
+    @property
+    def burn_severity(self):
+        """Per-detection severity table (severity, latitude, longitude, area_acres, date)"""
+        return self.severity_store.frame()
+
+    @property
+    def burn_severity_summary(self):
+        """Detections and burned area per (date, severity)"""
+        return self.severity_store.summary()
+
+    def append_hotspots(self, batch):
+        """Add a batch of new FIRMS detections to the burn severity and fire energy data.
+
+        Only the batch is classified; it is appended to the time-sorted
+        severity store and folded into the running per-day and per-severity
+        aggregates in O(batch), so live refreshes don't rebuild anything.
+        The batch's FRP is accumulated into the fire energy grid in O(batch)
+        as well, loading the grid first if no session has yet; late
+        detections re-integrate just the cells they fall in. Both are shared
+        by every session in the process, and the raw ``fire_hotspots`` table
+        (and so the per-event energy totals) is left unchanged.
+        """
+        if batch.empty:
+            return
+        batch = sort_by_time(normalize_hotspots(batch.copy()), 'acq_datetime')
+        # Always fold in: a grid built later from fire_hotspots would miss the batch.
+        # Energy goes first so a failure there leaves both stores without it
+        accumulate_energy(batch, self.fire_energy)
+        self.severity_store.append_hotspots(batch)
 
     # def load_vegetation_data(self):
     #     """Load vegetation and tree data from local files"""
@@ -108,27 +458,7 @@ class DataLoader:
 
     def load_vegetation_data(self):
         """Load vegetation and tree data from public Google Cloud URLs"""
-        try:
-            urls = {
-                "veg_processed": "https://storage.googleapis.com/localsolve_assets/la_wildfires_jan_2025/Vegeation_withburn_mode_processed.csv",
-                "trees_withburn": "https://storage.googleapis.com/localsolve_assets/la_wildfires_jan_2025/LATreeswithburn_new.csv",
-                "trees_processed": "https://storage.googleapis.com/localsolve_assets/la_wildfires_jan_2025/LATrees_processed.csv",
-            }
-    
-            for attr, url in urls.items():
-                response = requests.get(url)
-                if response.status_code == 200:
-                    csv_data = StringIO(response.text)
-                    setattr(self, attr, pd.read_csv(csv_data))
-                else:
-                    print(f"Failed to fetch {attr} data from {url}")
-                    setattr(self, attr, pd.DataFrame())
-    
-        except Exception as e:
-            print(f"Error loading vegetation data: {str(e)}")
-            self.veg_processed = pd.DataFrame()
-            self.trees_withburn = pd.DataFrame()
-            self.trees_processed = pd.DataFrame()
+        self.load_remote_assets(['veg_processed', 'trees_withburn', 'trees_processed'])
 
     def load_infrastructure(self):
         """Load infrastructure data"""
@@ -155,14 +485,46 @@ class DataLoader:
                                             n_trees // 3 + 1)[:n_trees]
         })
 
-    def get_fire_data_for_date(self, selected_date):
-        """Get fire hotspot data up to a specific date"""
+    def get_fire_data_for_date(self, selected_date, events=None):
+        """Get fire hotspot data up to a specific date, optionally only of some fire events"""
         if hasattr(self, 'fire_hotspots') and not self.fire_hotspots.empty:
-            return self.fire_hotspots[self.fire_hotspots['acq_date'].dt.date <= selected_date]
+            return self._of_events(self.hotspot_index.upto(selected_date), events)
         return pd.DataFrame()
 
     def get_burn_severity_for_date(self, selected_date):
         """Get burn severity data up to a specific date"""
-        if hasattr(self, 'burn_severity') and not self.burn_severity.empty:
-            return self.burn_severity[self.burn_severity['date'].dt.date <= selected_date]
+        if len(self.severity_store):
+            return self.severity_store.upto(selected_date)
+        return pd.DataFrame()
+
+    def get_fire_data_between(self, start_date, end_date, events=None):
+        """Get fire hotspot data for the inclusive date range [start_date, end_date]"""
+        if hasattr(self, 'fire_hotspots') and not self.fire_hotspots.empty:
+            return self._of_events(self.hotspot_index.between(start_date, end_date), events)
+        return pd.DataFrame()
+
+    def get_fire_data_in_bbox(self, bounds, selected_date=None, events=None):
+        """Get fire hotspots inside ``(west, south, east, north)``, optionally up to a date"""
+        if hasattr(self, 'fire_hotspots') and not self.fire_hotspots.empty:
+            stop = len(self.hotspot_index.upto(selected_date)) if selected_date is not None else None
+            return self._of_events(self.hotspot_spatial_index.bbox(bounds, stop), events)
+        return pd.DataFrame()
+
+    def get_fire_data_near(self, latitude, longitude, radius_km, selected_date=None, events=None):
+        """Get fire hotspots within ``radius_km`` of a point, optionally up to a date"""
+        if hasattr(self, 'fire_hotspots') and not self.fire_hotspots.empty:
+            stop = len(self.hotspot_index.upto(selected_date)) if selected_date is not None else None
+            return self._of_events(self.hotspot_spatial_index.radius(latitude, longitude, radius_km, stop), events)
+        return pd.DataFrame()
+
+    def _of_events(self, df, events):
+        """Rows of a ``fire_hotspots`` subset belonging to the given fire event ids (all if None)"""
+        if events is None:
+            return df
+        return df[self.fire_event_ids.loc[df.index].isin(list(events)).to_numpy()]
+
+    def get_burn_severity_between(self, start_date, end_date):
+        """Get burn severity data for the inclusive date range [start_date, end_date]"""
+        if len(self.severity_store):
+            return self.severity_store.between(start_date, end_date)
         return pd.DataFrame()
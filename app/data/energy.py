@@ -0,0 +1,248 @@
+"""
+Cumulative fire radiative energy (FRE) per grid cell, accumulated from hotspots.
+
+FRP is instantaneous power (MW); the energy a fire released is its integral
+over time. Detections are snapped to a grid and summed per cell and overpass
+(FRP is additive over pixels), and each cell's FRP is integrated over its
+overpasses with the trapezoid rule. Overpasses more than ``max_gap_hours``
+apart start a new burning run. Every observation also stands for
+``isolated_hours`` of burning split around it: half before the run's first
+overpass and half after its last, so a lone detection counts for
+``frp * isolated_hours``.
+
+The grid is dense and keeps each cell's last overpass (time, FRP, weight), so
+a batch only touches its own cells and costs O(batch): a continuation
+replaces the provisional tail of the previous observation with the trapezoid
+to the new one. Per-batch increments are kept sparsely so the grid can be
+read as of any earlier day.
+
+Every detection is also logged, so a late batch (overpasses older than the
+last one already seen in a cell) can still be folded in: only the cells it
+reaches back into are re-integrated from their logged detections.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+MWH_TO_GJ = 3.6
+
+# Free cells kept around the detections when the grid is sized or regrown
+PAD_CELLS = 32
+
+
+class EnergyGrid:
+    def __init__(self, cell_degrees=0.01, max_gap_hours=24, isolated_hours=6):
+        self.cell_degrees = cell_degrees
+        self.max_gap_hours = max_gap_hours
+        self.isolated_hours = isolated_hours
+        self.origin = None  # absolute (row, col) of cell [0, 0]
+        self.energy = np.zeros((0, 0))  # GJ per cell; row 0 is the south
+        self._last_time = np.zeros((0, 0))  # hours since the epoch of each cell's last overpass, NaN if none
+        self._last_frp = np.zeros((0, 0))
+        self._last_weight = np.zeros((0, 0))  # hours the last overpass's FRP currently counts for
+        self._history = []  # (last day of batch, absolute rows, absolute cols, increments in GJ)
+        self._log = []  # (absolute rows, absolute cols, hours, FRP) of every batch, for late detections
+        self._lock = threading.Lock()
+
+    @property
+    def bounds(self):
+        """(west, south, east, north) of the grid"""
+        n_rows, n_cols = self.energy.shape
+        row, col = self.origin or (0, 0)
+        return (col * self.cell_degrees, row * self.cell_degrees,
+                (col + n_cols) * self.cell_degrees, (row + n_rows) * self.cell_degrees)
+
+    @property
+    def total(self):
+        """Energy released over the whole grid so far, in GJ"""
+        return float(self.energy.sum())
+
+    def update(self, df):
+        """Fold a batch of hotspots (``latitude``, ``longitude``, ``acq_datetime``, ``frp``) into the grid.
+
+        Detections of an overpass already seen in a cell are folded into it.
+        Cells the batch reaches back into (overpasses older than the last one
+        seen there) are re-integrated from every detection logged for them,
+        which costs a pass over the log instead of O(batch). Returns the
+        energy (GJ) the batch added, attributed to its rows in proportion to
+        their FRP.
+        """
+        contributions = np.zeros(len(df))
+        if df.empty:
+            return contributions
+        lat = df['latitude'].to_numpy(np.float64)
+        lon = df['longitude'].to_numpy(np.float64)
+        frp = np.nan_to_num(df['frp'].to_numpy(np.float64)) if 'frp' in df else np.zeros(len(df))
+        hours = df['acq_datetime'].to_numpy('datetime64[s]').astype(np.int64) / 3600
+        abs_rows = np.floor(lat / self.cell_degrees).astype(np.int64)
+        abs_cols = np.floor(lon / self.cell_degrees).astype(np.int64)
+        day = np.datetime64(int(np.floor(hours.max() / 24)), 'D')
+
+        with self._lock:
+            if self.origin is None:
+                self._allocate(abs_rows, abs_cols)
+            elif not self._fits(abs_rows, abs_cols):
+                self._reallocate(abs_rows, abs_cols)
+            n_cols = self.energy.shape[1]
+            cells = (abs_rows - self.origin[0]) * n_cols + abs_cols - self.origin[1]
+
+            late = np.isin(cells, cells[hours < self._last_time.ravel()[cells]])
+            if late.any():
+                contributions[late] = self._reintegrate(cells[late], hours[late], frp[late], day)
+            if not late.all():
+                contributions[~late] = self._fold(cells[~late], hours[~late], frp[~late], day)
+            self._log.append((abs_rows, abs_cols, hours, frp))
+        return contributions
+
+    def _fold(self, cells, hours, frp, day):
+        """Add detections no older than their cells' last overpass in O(batch); their energy per row"""
+        obs_cell, obs_of_row, increment = self._integrate(
+            cells, hours, frp, self._last_time.ravel(), self._last_frp.ravel(), self._last_weight.ravel())
+        np.add.at(self.energy.ravel(), obs_cell, increment)
+        self._record(day, obs_cell, increment)
+        return increment[obs_of_row] * frp_shares(obs_of_row, frp)
+
+    def _reintegrate(self, cells, hours, frp, day):
+        """Recompute the cells of late detections from the log plus the batch; their energy per row"""
+        n_cols = self.energy.shape[1]
+        target = np.unique(cells)
+        parts = []
+        for rows, cols, logged_hours, logged_frp in self._log:
+            logged_cells = (rows - self.origin[0]) * n_cols + cols - self.origin[1]
+            keep = np.isin(logged_cells, target)
+            parts.append((logged_cells[keep], logged_hours[keep], logged_frp[keep]))
+        parts.append((cells, hours, frp))
+        all_cells, all_hours, all_frp = (np.concatenate(column) for column in zip(*parts, strict=True))
+        # Integrate from scratch on a compact grid of just the affected cells
+        compact = np.searchsorted(target, all_cells)
+        last_time, last_frp, last_weight = np.full(len(target), np.nan), np.zeros(len(target)), np.zeros(len(target))
+        obs_cell, _, increment = self._integrate(compact, all_hours, all_frp, last_time, last_frp, last_weight)
+        totals = np.bincount(obs_cell, weights=increment, minlength=len(target))
+
+        energy = self.energy.ravel()
+        delta = totals - energy[target]
+        energy[target] = totals
+        self._last_time.ravel()[target] = last_time
+        self._last_frp.ravel()[target] = last_frp
+        self._last_weight.ravel()[target] = last_weight
+        self._record(day, target, delta)
+        batch_cells = compact[len(compact) - len(cells):]
+        return delta[batch_cells] * frp_shares(batch_cells, frp)
+
+    def _integrate(self, cells, hours, frp, last_time, last_frp, last_weight):
+        """Energy (GJ) each (cell, overpass) observation adds on top of the cells' last overpasses.
+
+        ``last_*`` are flat per-cell arrays (NaN time for cells not seen yet)
+        and are moved on to each cell's newest observation in place. Returns
+        the observations' cells, each row's observation and the increments.
+        """
+        # One observation per (cell, overpass), in time order within each cell
+        order = np.lexsort((hours, cells))
+        new_obs = np.r_[True, (cells[order][1:] != cells[order][:-1])
+                        | (hours[order][1:] != hours[order][:-1])]
+        obs_of_row = np.empty(len(cells), dtype=np.int64)
+        obs_of_row[order] = np.cumsum(new_obs) - 1
+        first = order[new_obs]
+        obs_cell, obs_time = cells[first], hours[first]
+        obs_frp = np.bincount(obs_of_row, weights=frp, minlength=len(first))
+
+        leading = np.r_[True, obs_cell[1:] != obs_cell[:-1]]
+        stored_time = last_time[obs_cell[leading]]
+
+        # Overpasses already seen absorb the new FRP at their current weight
+        folded = np.zeros(len(first), dtype=bool)
+        folded[leading] = obs_time[leading] == stored_time
+        increment = np.where(folded, obs_frp * last_weight[obs_cell], 0.0)
+        effective_frp = np.where(folded, obs_frp + last_frp[obs_cell], obs_frp)
+        weight = np.where(folded, last_weight[obs_cell], 0.0)
+
+        # Everything else follows the previous observation of its cell, here or stored
+        prev_time = np.where(leading, last_time[obs_cell], np.r_[np.nan, obs_time[:-1]])
+        prev_frp = np.where(leading, last_frp[obs_cell], np.r_[0.0, effective_frp[:-1]])
+        half = self.isolated_hours / 2
+        with np.errstate(invalid='ignore'):
+            gap = obs_time - prev_time
+            continues = ~folded & (gap <= self.max_gap_hours)
+        starts = ~folded & ~continues
+        increment[continues] = (prev_frp[continues] * (gap[continues] / 2 - half)
+                                + obs_frp[continues] * (gap[continues] / 2 + half))
+        weight[continues] = gap[continues] / 2 + half
+        increment[starts] = obs_frp[starts] * self.isolated_hours
+        weight[starts] = self.isolated_hours
+        increment *= MWH_TO_GJ
+
+        trailing = np.r_[obs_cell[1:] != obs_cell[:-1], True]
+        last_time[obs_cell[trailing]] = obs_time[trailing]
+        last_frp[obs_cell[trailing]] = effective_frp[trailing]
+        last_weight[obs_cell[trailing]] = weight[trailing]
+        return obs_cell, obs_of_row, increment
+
+    def _record(self, day, cells, increment):
+        n_cols = self.energy.shape[1]
+        self._history.append((day, cells // n_cols + self.origin[0], cells % n_cols + self.origin[1], increment))
+
+    def energy_upto(self, date=None):
+        """Cumulative energy grid (GJ) as of the end of ``date``; the live grid when None"""
+        with self._lock:
+            if date is None:
+                return self.energy.copy()
+            day = np.datetime64(pd.Timestamp(date).date(), 'D')
+            grid = np.zeros_like(self.energy)
+            n_cols = grid.shape[1]
+            for batch_day, rows, cols, increment in self._history:
+                if batch_day <= day:
+                    np.add.at(grid.ravel(), (rows - self.origin[0]) * n_cols + cols - self.origin[1], increment)
+            return grid
+
+    def _allocate(self, rows, cols, pad=PAD_CELLS):
+        self.origin = (int(rows.min()) - pad, int(cols.min()) - pad)
+        shape = (int(rows.max()) + pad + 1 - self.origin[0], int(cols.max()) + pad + 1 - self.origin[1])
+        self.energy = np.zeros(shape)
+        self._last_time = np.full(shape, np.nan)
+        self._last_frp = np.zeros(shape)
+        self._last_weight = np.zeros(shape)
+
+    def _fits(self, rows, cols):
+        n_rows, n_cols = self.energy.shape
+        return (rows.min() >= self.origin[0] and rows.max() < self.origin[0] + n_rows
+                and cols.min() >= self.origin[1] and cols.max() < self.origin[1] + n_cols)
+
+    def _reallocate(self, rows, cols):
+        """Grow the grid to also cover ``rows``/``cols``, moving the accumulated state over"""
+        old_origin, old_rows, old_cols = self.origin, *self.energy.shape
+        old = (self.energy, self._last_time, self._last_frp, self._last_weight)
+        rows = np.r_[rows, old_origin[0], old_origin[0] + old_rows - 1]
+        cols = np.r_[cols, old_origin[1], old_origin[1] + old_cols - 1]
+        # Grow by a share of the extent too, so a steadily spreading fire regrows rarely
+        extent = max(int(rows.max() - rows.min()), int(cols.max() - cols.min()))
+        self._allocate(rows, cols, max(PAD_CELLS, extent // 4))
+        r0, c0 = old_origin[0] - self.origin[0], old_origin[1] - self.origin[1]
+        for new, values in zip((self.energy, self._last_time, self._last_frp, self._last_weight), old, strict=True):
+            new[r0:r0 + old_rows, c0:c0 + old_cols] = values
+
+
+def accumulate_energy(df, grid):
+    """Fold a time-sorted hotspot table into ``grid`` one day at a time; the energy of every row"""
+    contributions = np.zeros(len(df))
+    if not df.empty:
+        days = df['acq_datetime'].to_numpy('datetime64[D]')
+        starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+        for start, stop in zip(starts, np.append(starts[1:], len(df)), strict=True):
+            contributions[start:stop] = grid.update(df.iloc[start:stop])
+    return pd.Series(contributions, index=df.index, name='energy_gj')
+
+
+def frp_shares(groups, frp):
+    """Each row's share of its group's FRP (an even share where the group has none)"""
+    totals = np.bincount(groups, weights=frp)
+    return np.where(totals[groups] > 0, frp / np.where(totals > 0, totals, 1)[groups],
+                    1 / np.bincount(groups)[groups])
+
+
+def event_energy(event_ids, contributions):
+    """Total fire radiative energy (GJ) of each fire event, largest first"""
+    totals = pd.Series(np.asarray(contributions), name='energy_gj').groupby(np.asarray(event_ids)).sum()
+    totals.index.name = 'event_id'
+    return totals.sort_values(ascending=False)
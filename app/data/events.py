@@ -0,0 +1,167 @@
+"""
+Streaming spatio-temporal clustering of hotspots into fire events.
+
+FIRMS rows carry no fire identifier. ``EventClusterer`` assigns one in a
+single pass over time-ordered batches: detections are hashed into square
+cells of ``distance_km``, and a detection joins an event when it shares or
+neighbours a cell that event occupied within the last ``max_gap_hours``.
+Within a batch, touching cells are linked too, so each batch is one
+connected-components pass over a sparse graph of its cells plus the active
+cells they touch. Only cells seen within the time gap are kept as state, so
+memory is bounded by the active fire front rather than the history.
+
+When a batch bridges two existing events they are merged into the older
+one; ``resolve`` maps any previously returned id to its surviving event.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+KM_PER_DEGREE = 111.32
+
+# Neighbourhood of a cell, including itself
+_OFFSETS = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1)]
+
+
+class EventClusterer:
+    def __init__(self, distance_km=2.0, max_gap_hours=72):
+        self.distance_km = distance_km
+        self.max_gap_hours = max_gap_hours
+        self.reference_latitude = None
+        self._parent = np.zeros(0, dtype=np.int64)  # event id -> id it was merged into (or itself)
+        # Active cells, sorted by key
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._events = np.zeros(0, dtype=np.int64)
+        self._last_seen = np.zeros(0, dtype='datetime64[s]')
+        self._lock = threading.Lock()
+
+    @property
+    def n_events(self):
+        """Number of events created so far, including ones merged into others"""
+        return len(self._parent)
+
+    def update(self, latitude, longitude, times):
+        """Assign event ids to one batch of detections, not older than earlier batches.
+
+        Returns the ids as of this batch; later batches may merge events, so
+        pass stored ids through ``resolve`` before comparing them.
+        """
+        lat = np.asarray(latitude, dtype=np.float64)
+        lon = np.asarray(longitude, dtype=np.float64)
+        times = np.asarray(times).astype('datetime64[s]')
+        if len(lat) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        with self._lock:
+            if self.reference_latitude is None:
+                self.reference_latitude = float(np.median(lat))
+            self._expire(times.min())
+
+            keys = self._cell_keys(lat, lon)
+            cells, point_cell = np.unique(keys, return_inverse=True)
+            n_cells, n_active = len(cells), len(self._keys)
+
+            # Graph nodes: this batch's cells, then the active cells
+            sources, targets = [], []
+            for dr, dc in _OFFSETS:
+                neighbours = cells + (dr << 32) + dc
+                for node_keys, base in ((cells, 0), (self._keys, n_cells)):
+                    found = np.searchsorted(node_keys, neighbours)
+                    hit = found < len(node_keys)
+                    hit[hit] = node_keys[found[hit]] == neighbours[hit]
+                    sources.append(np.flatnonzero(hit))
+                    targets.append(found[hit] + base)
+            sources, targets = np.concatenate(sources), np.concatenate(targets)
+            n_nodes = n_cells + n_active
+            graph = coo_matrix((np.ones(len(sources), dtype=np.int8), (sources, targets)),
+                               shape=(n_nodes, n_nodes))
+            n_components, component = connected_components(graph, directed=False)
+
+            # Each component inherits the oldest active event it touches, else a new one
+            event_of = np.full(n_components, np.iinfo(np.int64).max)
+            active_events = self.resolve(self._events) if n_active else self._events
+            np.minimum.at(event_of, component[n_cells:], active_events)
+            touched = np.unique(component[:n_cells])
+            fresh = touched[event_of[touched] == np.iinfo(np.int64).max]
+            event_of[fresh] = len(self._parent) + np.arange(len(fresh))
+            self._parent = np.concatenate([self._parent, event_of[fresh]])
+
+            # Events bridged by this batch merge into the component's event
+            if n_active:
+                merged = active_events != event_of[component[n_cells:]]
+                self._parent[active_events[merged]] = event_of[component[n_cells:]][merged]
+
+            cell_events = event_of[component[:n_cells]]
+            cell_last = np.full(n_cells, times.min())
+            np.maximum.at(cell_last, point_cell, times)
+            self._remember(cells, cell_events, cell_last)
+            return cell_events[point_cell]
+
+    def resolve(self, ids):
+        """Map event ids (from any earlier batch) to the events they were merged into"""
+        ids = np.asarray(ids, dtype=np.int64)
+        while True:
+            parents = self._parent[ids]
+            if np.array_equal(parents, ids):
+                return ids
+            ids = parents
+
+    def _cell_keys(self, lat, lon):
+        scale = KM_PER_DEGREE / self.distance_km
+        rows = np.floor(lat * scale).astype(np.int64)
+        cols = np.floor(lon * scale * np.cos(np.radians(self.reference_latitude))).astype(np.int64)
+        return (rows << 32) + cols
+
+    def _expire(self, now):
+        keep = self._last_seen >= now - np.timedelta64(int(self.max_gap_hours * 3600), 's')
+        self._keys, self._events, self._last_seen = self._keys[keep], self._events[keep], self._last_seen[keep]
+
+    def _remember(self, cells, events, last_seen):
+        keys = np.concatenate([self._keys, cells])
+        events = np.concatenate([self.resolve(self._events), events])
+        last_seen = np.concatenate([self._last_seen, last_seen])
+        # Stable sort puts this batch after older entries of the same cell; keep the newest
+        order = np.argsort(keys, kind='stable')
+        keys, events, last_seen = keys[order], events[order], last_seen[order]
+        newest = np.r_[keys[1:] != keys[:-1], True]
+        self._keys, self._events, self._last_seen = keys[newest], events[newest], last_seen[newest]
+
+
+def cluster_hotspots(df, distance_km=2.0, max_gap_hours=72, clusterer=None):
+    """Event id of every row of a time-sorted hotspot table, streamed one day at a time"""
+    clusterer = clusterer or EventClusterer(distance_km, max_gap_hours)
+    ids = np.zeros(len(df), dtype=np.int64)
+    if df.empty:
+        return pd.Series(ids, index=df.index, name='event_id')
+    days = df['acq_datetime'].to_numpy('datetime64[D]')
+    starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    lat = df['latitude'].to_numpy(np.float64)
+    lon = df['longitude'].to_numpy(np.float64)
+    times = df['acq_datetime'].to_numpy('datetime64[s]')
+    for start, stop in zip(starts, np.append(starts[1:], len(df)), strict=True):
+        ids[start:stop] = clusterer.update(lat[start:stop], lon[start:stop], times[start:stop])
+    return pd.Series(clusterer.resolve(ids), index=df.index, name='event_id')
+
+
+def event_summary(df, event_ids):
+    """Per-event first/last detection, detection count, centroid and peak FRP"""
+    frame = pd.DataFrame({
+        'event_id': np.asarray(event_ids),
+        'acq_datetime': df['acq_datetime'].to_numpy(),
+        'latitude': df['latitude'].to_numpy(),
+        'longitude': df['longitude'].to_numpy(),
+        'frp': df['frp'].to_numpy() if 'frp' in df else np.nan,
+    })
+    summary = frame.groupby('event_id').agg(
+        first_seen=('acq_datetime', 'min'),
+        last_seen=('acq_datetime', 'max'),
+        detections=('acq_datetime', 'size'),
+        latitude=('latitude', 'mean'),
+        longitude=('longitude', 'mean'),
+        max_frp=('frp', 'max'),
+    )
+    return summary.sort_values('detections', ascending=False)
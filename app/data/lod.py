@@ -0,0 +1,94 @@
+"""
+Level-of-detail reduction of hotspot tables for web maps.
+
+Sending one marker per detection stops scaling once a season's worth of
+hotspots is loaded. ``level_of_detail`` keeps raw points while the rows in
+(and around) the visible map fit a marker budget, and otherwise aggregates
+them onto a lon/lat grid whose cells span a fixed number of screen pixels at
+the current zoom, coarsening the grid until the budget holds. Each cell
+reports its detection count, maximum brightness and maximum FRP.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Web map tiles are 512 px wide at zoom 0 in Mapbox GL
+TILE_PIXELS = 512
+
+# Rows within this many viewports on every side of the visible one are kept,
+# so short pans in the browser still show data
+VIEWPORT_MARGIN = 1.0
+
+
+def viewport_bounds(center, zoom, width, height, margin=VIEWPORT_MARGIN):
+    """(west, south, east, north) in degrees of a ``width`` x ``height`` px map view"""
+    degrees_per_pixel = 360 / (TILE_PIXELS * 2 ** zoom)
+    half_width = width * degrees_per_pixel * (0.5 + margin)
+    # Mercator y for the vertical extent, then back to latitude
+    y = np.log(np.tan(np.pi / 4 + np.radians(center['lat']) / 2))
+    half_height = np.radians(height * degrees_per_pixel * (0.5 + margin))
+    south = np.degrees(2 * np.arctan(np.exp(y - half_height)) - np.pi / 2)
+    north = np.degrees(2 * np.arctan(np.exp(y + half_height)) - np.pi / 2)
+    return (center['lon'] - half_width, south, center['lon'] + half_width, north)
+
+
+def in_bounds(df, bounds):
+    """Rows of ``df`` whose latitude/longitude fall inside ``bounds``"""
+    west, south, east, north = bounds
+    lon = df['longitude'].to_numpy()
+    lat = df['latitude'].to_numpy()
+    return df[(lon >= west) & (lon <= east) & (lat >= south) & (lat <= north)]
+
+
+def grid_aggregate(df, cell_degrees, origin=(-180.0, -90.0)):
+    """Aggregate hotspots onto square ``cell_degrees`` cells.
+
+    Returns one row per non-empty cell with the detections' mean position
+    (so markers sit on the data rather than on cell corners), ``count``,
+    and the maximum ``brightness`` and ``frp``.
+    """
+    lon = df['longitude'].to_numpy(np.float64)
+    lat = df['latitude'].to_numpy(np.float64)
+    col = np.floor((lon - origin[0]) / cell_degrees).astype(np.int64)
+    row = np.floor((lat - origin[1]) / cell_degrees).astype(np.int64)
+    keys = row * (int(np.ceil(360 / cell_degrees)) + 1) + col
+
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]) if len(keys) else np.array([], dtype=np.int64)
+    count = np.diff(np.append(starts, len(keys)))
+
+    cells = pd.DataFrame({
+        'latitude': np.add.reduceat(lat[order], starts) / count if len(keys) else np.array([]),
+        'longitude': np.add.reduceat(lon[order], starts) / count if len(keys) else np.array([]),
+        'count': count,
+    })
+    for column in ['brightness', 'frp']:
+        if column in df:
+            values = df[column].to_numpy(np.float64)[order]
+            cells[column] = np.fmax.reduceat(values, starts) if len(keys) else np.array([])
+    return cells
+
+
+def level_of_detail(df, center, zoom, width, height, max_points, cell_pixels=8, index=None):
+    """Reduce ``df`` to at most ``max_points`` markers for the given map view.
+
+    Returns ``(frame, aggregated)``: the raw rows near the view when they fit
+    the budget, otherwise the ``grid_aggregate`` cells, starting at
+    ``cell_pixels`` screen pixels per cell and doubling until they fit.
+    ``index`` is an optional ``QuadkeyIndex`` over a frame of which ``df``
+    is a prefix (e.g. a date cutoff), used instead of scanning ``df``.
+    """
+    if len(df) <= max_points:
+        return df, False
+    bounds = viewport_bounds(center, zoom, width, height)
+    visible = index.bbox(bounds, stop=len(df)) if index is not None else in_bounds(df, bounds)
+    if len(visible) <= max_points:
+        return visible, False
+
+    cell_degrees = cell_pixels * 360 / (TILE_PIXELS * 2 ** zoom)
+    cells = grid_aggregate(visible, cell_degrees)
+    while len(cells) > max_points:
+        cell_degrees *= 2
+        cells = grid_aggregate(visible, cell_degrees)
+    return cells, True
@@ -0,0 +1,255 @@
+"""
+Daily cumulative fire perimeters reconstructed from hotspots.
+
+Detections are snapped to a grid of roughly VIIRS-pixel-sized cells and
+accumulated into a burned-cell mask one day at a time, so day N starts from
+day N-1's mask. Burned cells within ``gap_cells`` of each other form one
+cluster (connected components of the dilated mask), and each cluster's
+perimeter is the concave hull of its outline cells' centres, padded by half
+a cell.
+Clusters only ever grow or merge, so a cluster without new cells on a given
+day is exactly yesterday's and its polygon is reused; only the touched
+clusters are re-hulled, all at once through Shapely's vectorized functions.
+The morphology runs on a window around each day's new cells, which is all
+that can join them to existing clusters, so a day costs O(its detections and
+the clusters they touch) rather than O(grid).
+Polygons are kept per day, which is what the growth-ring overlay reads.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+import shapely
+from scipy import ndimage
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+# Free cells kept around the burned area when the grid is sized or regrown
+PAD_CELLS = 32
+
+KM_PER_DEGREE = 111.32
+KM2_TO_ACRES = 247.105
+
+
+class PerimeterEngine:
+    def __init__(self, cell_degrees=0.0035, gap_cells=2, concave_ratio=0.3):
+        """``cell_degrees`` ~375 m cells; clusters bridge gaps of up to ``gap_cells`` cells"""
+        self.cell_degrees = cell_degrees
+        self.gap_cells = gap_cells
+        self.concave_ratio = concave_ratio
+        self.origin = None
+        self.days = []  # processed days, ascending
+        self._mask = np.zeros((0, 0), dtype=bool)
+        self._cluster_of = np.zeros((0, 0), dtype=np.int64)  # cluster key of each burned cell, -1 elsewhere
+        self._perimeters = {}  # day -> DataFrame of that day's cumulative clusters
+        self._polygons = {}  # first mask cell of a cluster -> (cells, polygon), as of the last day
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_hotspots(cls, df, **kwargs):
+        """Engine over ``df``'s bounding box with every day of ``df`` processed"""
+        engine = cls(**kwargs)
+        if not df.empty:
+            engine.extend(df)
+        return engine
+
+    def extend(self, df):
+        """Process new days of hotspots (``acq_date``, ``latitude``, ``longitude``).
+
+        Days must not be older than the last processed day; rows of that
+        same day are folded into it. The grid is sized from the first batch
+        plus a margin of ``PAD_CELLS`` and regrown whenever detections fall
+        outside it.
+        """
+        if df.empty:
+            return
+        with self._lock:
+            lat = df['latitude'].to_numpy(np.float64)
+            lon = df['longitude'].to_numpy(np.float64)
+            days = df['acq_date'].to_numpy('datetime64[D]')
+            # Absolute cell indices, so cells never move when the grid is regrown
+            abs_rows = np.floor(lat / self.cell_degrees).astype(np.int64)
+            abs_cols = np.floor(lon / self.cell_degrees).astype(np.int64)
+            if self.origin is None:
+                self._allocate(abs_rows, abs_cols)
+            elif not self._fits(abs_rows, abs_cols):
+                self._reallocate(abs_rows, abs_cols)
+            rows, cols = abs_rows - self.origin[0], abs_cols - self.origin[1]
+
+            unique_days = np.unique(days)
+            if self.days and len(unique_days) and unique_days[0] < self.days[-1]:
+                raise ValueError(f"Perimeters are built in day order; {unique_days[0]} is before {self.days[-1]}")
+            order = np.argsort(days, kind='stable')
+            bounds = np.append(np.searchsorted(days[order], unique_days), len(days))
+            for day, start, stop in zip(unique_days, bounds[:-1], bounds[1:], strict=True):
+                on_day = order[start:stop]
+                self._add_day(day, rows[on_day], cols[on_day])
+
+    def perimeters(self, date):
+        """Cumulative cluster perimeters as of ``date`` (the last processed day on or before it)"""
+        day = np.datetime64(pd.Timestamp(date).date(), 'D')
+        with self._lock:
+            k = np.searchsorted(np.array(self.days, dtype='datetime64[D]'), day, side='right')
+            return self._perimeters[self.days[k - 1]] if k else _empty_perimeters()
+
+    def growth_rings(self, date=None):
+        """Perimeters of every processed day up to ``date``, with a ``date`` column"""
+        with self._lock:
+            days = [day for day in self.days
+                    if date is None or day <= np.datetime64(pd.Timestamp(date).date(), 'D')]
+            frames = [self._perimeters[day].assign(date=pd.Timestamp(day)) for day in days]
+        return pd.concat(frames, ignore_index=True) if frames else _empty_perimeters().assign(date=pd.NaT)
+
+    def _allocate(self, rows, cols, pad=PAD_CELLS):
+        self.origin = (int(rows.min()) - pad, int(cols.min()) - pad)  # (row, col) of cell [0, 0]
+        self._mask = np.zeros((int(rows.max()) + pad + 1 - self.origin[0],
+                               int(cols.max()) + pad + 1 - self.origin[1]), dtype=bool)
+        self._cluster_of = np.full(self._mask.shape, -1, dtype=np.int64)
+
+    def _fits(self, rows, cols):
+        n_rows, n_cols = self._mask.shape
+        return (rows.min() >= self.origin[0] and rows.max() < self.origin[0] + n_rows
+                and cols.min() >= self.origin[1] and cols.max() < self.origin[1] + n_cols)
+
+    def _reallocate(self, rows, cols):
+        """Grow the grid to also cover ``rows``/``cols``, moving burned cells and clusters over"""
+        old_origin, old_mask = self.origin, self._mask
+        old_rows, old_cols = old_mask.shape
+        rows = np.r_[rows, old_origin[0], old_origin[0] + old_rows - 1]
+        cols = np.r_[cols, old_origin[1], old_origin[1] + old_cols - 1]
+        # Grow by a share of the extent too, so a steadily spreading fire regrows rarely
+        extent = max(int(rows.max() - rows.min()), int(cols.max() - cols.min()))
+        self._allocate(rows, cols, max(PAD_CELLS, extent // 4))
+        row_shift, col_shift = old_origin[0] - self.origin[0], old_origin[1] - self.origin[1]
+        self._mask[row_shift:row_shift + old_rows, col_shift:col_shift + old_cols] = old_mask
+
+        n_cols = self._mask.shape[1]
+
+        def moved(cells):
+            return (cells // old_cols + row_shift) * n_cols + cells % old_cols + col_shift
+
+        # Row-major order survives the shift, so each cluster keeps its first cell
+        self._polygons = {int(moved(cells[0])): (moved(cells), polygon)
+                          for cells, polygon in self._polygons.values()}
+        cluster_of = self._cluster_of.ravel()
+        for key, (cells, _) in self._polygons.items():
+            cluster_of[cells] = key
+
+    def _add_day(self, day, rows, cols):
+        cells = np.unique(rows * self._mask.shape[1] + cols)
+        new_cells = cells[~self._mask.ravel()[cells]]
+        if len(new_cells):
+            self._mask.ravel()[new_cells] = True
+            changed = self._merge(new_cells)
+            # Interior cells can't shape a hull; leave them out of the geometry work
+            outlines = [cells[~self._interior(cells)] for cells in changed]
+            for cells, polygon in zip(changed, self._hulls(outlines), strict=True):
+                self._polygons[int(cells[0])] = (cells, polygon)
+
+        if self.days and self.days[-1] == day:
+            self.days.pop()
+        self.days.append(day)
+        self._perimeters[day] = self._frame()
+
+    def _merge(self, new_cells):
+        """Join newly burned cells to each other and to the clusters they bridge to.
+
+        Cells whose (2 * ``gap_cells`` + 1)-cell squares touch are bridged, so
+        only burned cells within that reach of a new cell matter and the
+        dilation and labelling run on that window alone. Old clusters
+        linked through a new cell merge, also when they meet in different
+        parts of the window. Returns the cells of every changed cluster,
+        each sorted so that its first cell is its key.
+        """
+        n_rows, n_cols = self._mask.shape
+        reach = 2 * self.gap_cells + 1
+        rows, cols = new_cells // n_cols, new_cells % n_cols
+        r0, r1 = max(int(rows.min()) - reach, 0), min(int(rows.max()) + reach + 1, n_rows)
+        c0, c1 = max(int(cols.min()) - reach, 0), min(int(cols.max()) + reach + 1, n_cols)
+        window = self._mask[r0:r1, c0:c1]
+        structure = np.ones((3, 3), dtype=bool)
+        bridged = ndimage.binary_dilation(window, structure, iterations=self.gap_cells) \
+            if self.gap_cells else window
+        labels, n_labels = ndimage.label(bridged, structure)
+
+        # Burned cells in the window sharing a component with a new cell
+        burned_rows, burned_cols = np.nonzero(window)
+        burned_labels = labels[burned_rows, burned_cols]
+        keep = np.isin(burned_labels, labels[rows - r0, cols - c0])
+        burned = (burned_rows[keep] + r0) * n_cols + burned_cols[keep] + c0
+        burned_labels = burned_labels[keep]
+        cluster_of = self._cluster_of.ravel()
+        old = cluster_of[burned]
+
+        # Window components and the old clusters they contain, merged transitively
+        is_old = old >= 0
+        old_keys, old_index = np.unique(old[is_old], return_inverse=True)
+        graph = coo_matrix((np.ones(is_old.sum()), (burned_labels[is_old], n_labels + 1 + old_index)),
+                           shape=(n_labels + 1 + len(old_keys),) * 2)
+        _, group = connected_components(graph, directed=False)
+
+        changed = []
+        new_group = group[burned_labels[~is_old]]
+        for g in np.unique(new_group):
+            merged = old_keys[group[n_labels + 1:] == g]
+            cells = np.sort(np.concatenate([burned[~is_old][new_group == g]]
+                                           + [self._polygons.pop(int(key))[0] for key in merged]))
+            cluster_of[cells] = cells[0]
+            changed.append(cells)
+        return changed
+
+    def _interior(self, cells):
+        """Whether each burned cell has all 8 neighbours burned (cells never lie on the grid edge)"""
+        n_cols = self._mask.shape[1]
+        mask = self._mask.ravel()
+        interior = np.ones(len(cells), dtype=bool)
+        for offset in (-n_cols - 1, -n_cols, -n_cols + 1, -1, 1, n_cols - 1, n_cols, n_cols + 1):
+            interior &= mask[cells + offset]
+        return interior
+
+    def _hulls(self, clusters):
+        """Concave hulls of the cell centres of each cluster's outline, padded by half a cell"""
+        if not clusters:
+            return []
+        n_cols = self._mask.shape[1]
+        points = [np.column_stack([(self.origin[1] + cells % n_cols + 0.5) * self.cell_degrees,
+                                   (self.origin[0] + cells // n_cols + 0.5) * self.cell_degrees])
+                  for cells in clusters]
+        hulls = shapely.concave_hull(shapely.multipoints(np.concatenate(points),
+                                                         indices=np.repeat(np.arange(len(points)),
+                                                                           [len(p) for p in points])),
+                                     ratio=self.concave_ratio)
+        return shapely.buffer(hulls, self.cell_degrees / 2, quad_segs=2)
+
+    def _frame(self):
+        if not self._polygons:
+            return _empty_perimeters()
+        keys = np.sort(np.array(list(self._polygons), dtype=np.int64))
+        cells = [self._polygons[key][0] for key in keys.tolist()]
+        geometry = np.array([self._polygons[key][1] for key in keys.tolist()], dtype=object)
+        lat = shapely.get_y(shapely.centroid(geometry))
+        area_km2 = shapely.area(geometry) * KM_PER_DEGREE ** 2 * np.cos(np.radians(lat))
+        # Cluster ids are the absolute (row, col) of their first cell, stable across regrows
+        n_cols = self._mask.shape[1]
+        rows, cols = self.origin[0] + keys // n_cols, self.origin[1] + keys % n_cols
+        return pd.DataFrame({
+            'cluster': (rows << 32) | (cols & 0xFFFFFFFF),
+            'cells': [len(c) for c in cells],
+            'area_acres': area_km2 * KM2_TO_ACRES,
+            'geometry': geometry,
+        })
+
+
+def perimeter_geojson(perimeters):
+    """GeoJSON FeatureCollection of a ``perimeters``/``growth_rings`` frame"""
+    features = [{'type': 'Feature', 'geometry': shapely.geometry.mapping(polygon),
+                 'properties': {'cluster': int(cluster)}}
+                for cluster, polygon in zip(perimeters['cluster'], perimeters['geometry'], strict=True)]
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def _empty_perimeters():
+    return pd.DataFrame({'cluster': np.array([], dtype=np.int64), 'cells': np.array([], dtype=np.int64),
+                         'area_acres': np.array([], dtype=np.float64),
+                         'geometry': np.array([], dtype=object)})
@@ -0,0 +1,101 @@
+"""
+Server-side raster rendering of dense hotspot layers.
+
+Instead of one marker (or grid cell) per point, the hotspots in a viewport
+are binned straight onto a canvas with one bin per screen pixel, shaded
+with a colour scale and sent as a single PNG image overlay. Binning is one
+pass of integer arithmetic over the points in view; shading, encoding and
+everything the browser does afterwards scale with the pixel count only.
+Pixels take the maximum brightness of their points, and their opacity grows
+with the log of the point count, datashader style.
+"""
+
+import io
+import re
+
+import numpy as np
+from PIL import Image
+
+MIN_ALPHA = 140
+
+
+def colormap_lut(colorscale, n=256):
+    """``n`` x 3 uint8 lookup table interpolated from Plotly-style colour strings"""
+    stops = np.array([_parse_color(color) for color in colorscale], dtype=np.float64)
+    positions = np.linspace(0, 1, len(stops))
+    samples = np.linspace(0, 1, n)
+    return np.stack([np.interp(samples, positions, stops[:, channel]) for channel in range(3)],
+                    axis=1).round().astype(np.uint8)
+
+
+def mercator_y(latitude):
+    """Web Mercator y (radians) of latitudes in degrees"""
+    return np.log(np.tan(np.pi / 4 + np.radians(latitude) / 2))
+
+
+def rasterize(latitude, longitude, values, bounds, width, height):
+    """Bin points onto a ``height`` x ``width`` canvas spanning ``bounds``.
+
+    Rows are linear in Web Mercator y, matching how web maps stretch image
+    overlays between their corner coordinates. Returns per-pixel counts and
+    the per-pixel maximum of ``values`` ignoring NaN (NaN where empty or no
+    value is finite), row 0 at the north.
+    """
+    west, south, east, north = bounds
+    x = (np.asarray(longitude, dtype=np.float64) - west) / (east - west) * width
+    top, bottom = mercator_y(north), mercator_y(south)
+    y = (top - mercator_y(np.asarray(latitude, dtype=np.float64))) / (top - bottom) * height
+    inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+    pixels = y[inside].astype(np.int64) * width + x[inside].astype(np.int64)
+
+    counts = np.bincount(pixels, minlength=width * height)
+    maxima = np.full(width * height, -np.inf)
+    np.fmax.at(maxima, pixels, np.asarray(values, dtype=np.float64)[inside])
+    maxima[~np.isfinite(maxima)] = np.nan
+    return counts.reshape(height, width), maxima.reshape(height, width)
+
+
+def shade(counts, maxima, lut, vmin, vmax):
+    """RGBA canvas: colour from ``maxima`` through ``lut``, opacity from log ``counts``"""
+    rgba = np.zeros(counts.shape + (4,), dtype=np.uint8)
+    # Only occupied pixels are shaded; the rest stay transparent
+    occupied = np.flatnonzero(counts)
+    if len(occupied):
+        pixels = rgba.reshape(-1, 4)
+        hits = counts.ravel()[occupied]
+        scale = (maxima.ravel()[occupied] - vmin) / max(vmax - vmin, 1e-12)
+        # Points without a value still show, in the lowest colour
+        scale = np.nan_to_num(scale, nan=0.0)
+        pixels[occupied, :3] = lut[np.clip(scale * (len(lut) - 1), 0, len(lut) - 1).astype(np.int64)]
+        density = np.log1p(hits) / np.log1p(hits.max())
+        pixels[occupied, 3] = (MIN_ALPHA + (255 - MIN_ALPHA) * density).astype(np.uint8)
+    return rgba
+
+
+def colorize(values, lut, vmin, vmax, alpha=180):
+    """RGBA canvas of a gridded surface through ``lut``; NaN cells are transparent"""
+    rgba = np.zeros(values.shape + (4,), dtype=np.uint8)
+    valid = np.isfinite(values)
+    scale = (values[valid] - vmin) / max(vmax - vmin, 1e-12)
+    rgba[valid, :3] = lut[np.clip(scale * (len(lut) - 1), 0, len(lut) - 1).astype(np.int64)]
+    rgba[valid, 3] = alpha
+    return rgba
+
+
+def to_png(rgba):
+    """Encode an RGBA canvas as PNG bytes"""
+    buffer = io.BytesIO()
+    Image.fromarray(rgba, 'RGBA').save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
+
+
+def render_png(latitude, longitude, values, bounds, width, height, lut, vmin, vmax):
+    """Rasterize, shade and encode points in ``bounds`` as a ``width`` x ``height`` PNG"""
+    counts, maxima = rasterize(latitude, longitude, values, bounds, width, height)
+    return to_png(shade(counts, maxima, lut, vmin, vmax))
+
+
+def _parse_color(color):
+    if color.startswith('#'):
+        return [int(color[i:i + 2], 16) for i in (1, 3, 5)]
+    return [float(part) for part in re.findall(r'[\d.]+', color)[:3]]
@@ -0,0 +1,148 @@
+"""
+Process-wide registry of read-only datasets shared by every Streamlit session.
+
+Streamlit builds a new ``DataLoader`` (and new components) for each browser
+session, and ``st.cache_data`` hands every caller its own unpickled copy.
+The registry instead loads each dataset once per process and gives every
+session the same object. The NumPy buffers behind shared frames are flagged
+read-only, so an accidental in-place write raises instead of leaking into
+other sessions; derived frames (filters, slices, ``copy()``) are unaffected.
+"""
+
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:  # used outside Streamlit
+    get_script_run_ctx = None
+
+
+class DatasetRegistry:
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get_or_load(self, key, loader, owner=None):
+        """Return the shared value for ``key``, calling ``loader()`` on first use.
+
+        ``owner`` is the per-session object (e.g. a ``DataLoader``) reading
+        the value; owners are tracked weakly, with their Streamlit session
+        (see ``session_id``), to report how many sessions share it. A loader
+        returning ``None`` signals failure and is not cached, so the next
+        session retries.
+        """
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                value = loader()
+                if value is None:
+                    return None
+                freeze(value)
+                entry = {'value': value, 'bytes': nbytes(value), 'owners': weakref.WeakKeyDictionary()}
+                with self._lock:
+                    self._entries[key] = entry
+        if owner is not None:
+            session = getattr(owner, 'session_id', None) or session_id() or id(owner)
+            with self._lock:
+                entry['owners'][owner] = session
+        return entry['value']
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def replace(self, key, value):
+        """Swap in a new shared value for ``key``, keeping its owners"""
+        freeze(value)
+        with self._lock:
+            entry = self._entries.setdefault(key, {'owners': weakref.WeakKeyDictionary()})
+            entry['value'] = value
+            entry['bytes'] = nbytes(value)
+
+    def discard(self, predicate):
+        """Drop every entry whose key satisfies ``predicate``, e.g. superseded dataset versions.
+
+        Sessions already holding one of the values keep their reference.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+                self._key_locks.pop(key, None)
+
+    def stats(self):
+        """Return dataset count, live sessions, shared bytes and bytes saved by sharing"""
+        with self._lock:
+            entries = list(self._entries.values())
+            sessions = set()
+            shared_bytes = saved_bytes = 0
+            for entry in entries:
+                # One session may hold several owners (e.g. a DataLoader per rerun)
+                entry_sessions = set(entry['owners'].values())
+                sessions.update(entry_sessions)
+                shared_bytes += entry['bytes']
+                saved_bytes += entry['bytes'] * max(len(entry_sessions) - 1, 0)
+        return {
+            'datasets': len(entries),
+            'sessions': len(sessions),
+            'shared_bytes': shared_bytes,
+            'saved_bytes': saved_bytes,
+        }
+
+
+def session_id():
+    """Id of the Streamlit session running the current script thread, or None outside one"""
+    if get_script_run_ctx is None:
+        return None
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else None
+
+
+def freeze(value):
+    """Flag the NumPy buffers behind ``value`` as read-only, recursing into containers"""
+    if isinstance(value, dict):
+        for item in value.values():
+            freeze(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            freeze(item)
+    elif isinstance(value, pd.DataFrame):
+        for block in value._mgr.blocks:
+            values = getattr(block.values, '_ndarray', block.values)
+            if isinstance(values, np.ndarray):
+                values.flags.writeable = False
+    elif isinstance(value, pd.Series):
+        values = getattr(value.array, '_ndarray', value.array)
+        if isinstance(values, np.ndarray):
+            values.flags.writeable = False
+    elif isinstance(value, np.ndarray):
+        value.flags.writeable = False
+
+
+def nbytes(value):
+    """Approximate in-memory size of ``value``"""
+    if isinstance(value, dict):
+        return sum(nbytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(nbytes(item) for item in value)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    return 0
+
+
+_registry = DatasetRegistry()
+
+
+def get_registry():
+    """Return the process-wide ``DatasetRegistry``"""
+    return _registry
@@ -0,0 +1,237 @@
+"""
+Burn severity classification of fire hotspots and its summaries.
+
+Severity is binned from brightness temperature and area approximated from
+the scan/track pixel footprint. ``SeverityStore`` keeps the classified rows in
+time order together with running per-day aggregates, so new detections can
+be appended in O(batch). The same classification backs the chunked,
+bounded-memory mode used for archives that don't fit in RAM, so both modes
+classify and measure every detection identically.
+"""
+
+import bisect
+import threading
+
+import numpy as np
+import pandas as pd
+from data.hotspots import FLOAT_COLUMNS
+from data.registry import freeze
+
+SEVERITY_BINS = [-float('inf'), 325, 350, float('inf')]
+SEVERITY_LABELS = ['Low', 'Medium', 'High']
+SQ_M_TO_ACRES = 0.000247105
+
+# Columns the chunked summary reads from the hotspot CSV
+SUMMARY_COLUMNS = ['acq_date', 'brightness', 'scan', 'track']
+
+# Rough peak cost of one SUMMARY_COLUMNS row while a chunk is parsed and
+# summarized (parsed values, text buffers and temporaries), measured with
+# tracemalloc on FIRMS-shaped data
+BYTES_PER_ROW = 256
+
+
+def classify_severity(brightness):
+    """Map brightness temperature (K) to Low/Medium/High severity"""
+    return pd.cut(brightness, bins=SEVERITY_BINS, labels=SEVERITY_LABELS)
+
+
+def area_acres(scan, track):
+    """Approximate burned area from scan and track - a simplified calculation"""
+    return scan * track * SQ_M_TO_ACRES
+
+
+def hotspot_severity_columns(hotspots):
+    """Severity codes, coordinates, area and day of raw or normalized hotspot rows"""
+    # Same dtypes as normalize_hotspots so raw chunks and loaded tables round identically
+    measurements = hotspots[['brightness', 'scan', 'track']].astype(
+        {column: FLOAT_COLUMNS[column] for column in ['brightness', 'scan', 'track']})
+    return {
+        'codes': classify_severity(measurements['brightness']).cat.codes.to_numpy(np.int8),
+        'latitude': hotspots['latitude'].to_numpy(np.float64) if 'latitude' in hotspots else None,
+        'longitude': hotspots['longitude'].to_numpy(np.float64) if 'longitude' in hotspots else None,
+        'area_acres': area_acres(measurements['scan'], measurements['track']).to_numpy(np.float64),
+        'dates': pd.to_datetime(hotspots['acq_date'], format='ISO8601').to_numpy('datetime64[us]'),
+    }
+
+
+class SeverityStore:
+    """Time-sorted burn severity rows plus running per-day, per-severity aggregates.
+
+    Rows live in over-allocated NumPy columns, so appending a batch that is
+    not older than the newest stored row costs O(batch) amortized, and so
+    does updating the aggregates. With ``keep_rows=False`` only the
+    aggregates are kept, which is what the bounded-memory chunked mode uses.
+    """
+
+    COLUMNS = {'codes': np.int8, 'latitude': np.float64, 'longitude': np.float64,
+               'area_acres': np.float64, 'dates': 'datetime64[us]'}
+
+    def __init__(self, keep_rows=True):
+        self.keep_rows = keep_rows
+        self.version = 0
+        self._n = 0
+        self._columns = {name: np.empty(0, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+        self._day_values = []  # distinct days of the stored rows, ascending
+        self._day_starts = []  # first row of each of those days
+        self._daily = {}  # day -> (counts, area) arrays indexed by severity code
+        self._frame = None
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return self._n
+
+    def append_hotspots(self, hotspots):
+        """Classify raw or normalized hotspot rows and append them"""
+        if not hotspots.empty:
+            self.append(**hotspot_severity_columns(hotspots))
+
+    def append(self, codes, latitude, longitude, area_acres, dates):
+        """Append one batch of classified detections"""
+        if len(codes) == 0:
+            return
+        with self._lock:
+            self._add_to_aggregates(codes, area_acres, dates)
+            if self.keep_rows:
+                self._append_rows({'codes': codes, 'latitude': latitude, 'longitude': longitude,
+                                   'area_acres': area_acres, 'dates': dates})
+            self.version += 1
+            self._frame = None
+
+    def totals(self):
+        """Detections and area per severity over everything appended so far"""
+        with self._lock:
+            counts = np.zeros(len(SEVERITY_LABELS), dtype=np.int64)
+            areas = np.zeros(len(SEVERITY_LABELS))
+            for day_counts, day_areas in self._daily.values():
+                counts += day_counts
+                areas += day_areas
+        return pd.DataFrame({'count': counts, 'area_acres': areas},
+                            index=pd.CategoricalIndex(SEVERITY_LABELS, categories=SEVERITY_LABELS, ordered=True,
+                                                      name='severity'))
+
+    def summary(self):
+        """Detections and area per (date, severity), omitting empty combinations"""
+        with self._lock:
+            if not self._daily:
+                return empty_summary()
+            days = sorted(self._daily)
+            counts = np.stack([self._daily[day][0] for day in days])
+            areas = np.stack([self._daily[day][1] for day in days])
+        day_index, code_index = np.nonzero(counts)
+        index = pd.MultiIndex.from_arrays(
+            [pd.DatetimeIndex(np.array(days, dtype='datetime64[us]')[day_index]),
+             pd.Categorical.from_codes(code_index, categories=SEVERITY_LABELS, ordered=True)],
+            names=['date', 'severity'])
+        return pd.DataFrame({'count': counts[day_index, code_index],
+                             'area_acres': areas[day_index, code_index]}, index=index)
+
+    def frame(self):
+        """All stored rows as a read-only ``burn_severity`` table, rebuilt only after appends"""
+        with self._lock:
+            if self._frame is None:
+                self._frame = self._rows(0, self._n)
+                freeze(self._frame)
+            return self._frame
+
+    def upto(self, date):
+        """Rows on or before the calendar day ``date``"""
+        with self._lock:
+            return self._rows(0, self._day_stop(date))
+
+    def between(self, start, end):
+        """Rows whose calendar day lies in the inclusive range [``start``, ``end``]"""
+        with self._lock:
+            return self._rows(self._day_start(start), self._day_stop(end))
+
+    def _add_to_aggregates(self, codes, area_acres, dates):
+        days = np.asarray(dates).astype('datetime64[D]')
+        unique_days, day_index = np.unique(days, return_inverse=True)
+        n_codes = len(SEVERITY_LABELS)
+        keys = day_index * n_codes + codes
+        counts = np.bincount(keys, minlength=len(unique_days) * n_codes).reshape(-1, n_codes)
+        areas = np.bincount(keys, weights=area_acres, minlength=len(unique_days) * n_codes).reshape(-1, n_codes)
+        for day, day_counts, day_areas in zip(unique_days, counts, areas, strict=True):
+            if day in self._daily:
+                self._daily[day][0][:] += day_counts
+                self._daily[day][1][:] += day_areas
+            else:
+                self._daily[day] = (day_counts.astype(np.int64), day_areas.astype(np.float64))
+
+    def _append_rows(self, batch):
+        order = np.argsort(batch['dates'], kind='stable')
+        batch = {name: np.asarray(values)[order] for name, values in batch.items()}
+        if self._n and batch['dates'][0] < self._columns['dates'][self._n - 1]:
+            # Late detections: merge into the sorted rows, O(n log n)
+            merged = {name: np.concatenate([self._columns[name][:self._n], batch[name]])
+                      for name in self.COLUMNS}
+            order = np.argsort(merged['dates'], kind='stable')
+            self._n = 0
+            self._day_values, self._day_starts = [], []
+            batch = {name: values[order] for name, values in merged.items()}
+
+        start, stop = self._n, self._n + len(batch['codes'])
+        if stop > len(self._columns['codes']):
+            capacity = max(stop, 2 * len(self._columns['codes']), 1024)
+            for name, values in self._columns.items():
+                grown = np.empty(capacity, dtype=values.dtype)
+                grown[:start] = values[:start]
+                self._columns[name] = grown
+        for name, values in batch.items():
+            self._columns[name][start:stop] = values
+        self._n = stop
+
+        days = batch['dates'].astype('datetime64[D]')
+        new_day = np.r_[True, days[1:] != days[:-1]]
+        for offset in np.flatnonzero(new_day):
+            if not self._day_values or days[offset] != self._day_values[-1]:
+                self._day_values.append(days[offset])
+                self._day_starts.append(start + offset)
+
+    def _rows(self, start, stop):
+        columns = self._columns
+        return pd.DataFrame({
+            'severity': pd.Categorical.from_codes(columns['codes'][start:stop], categories=SEVERITY_LABELS, ordered=True),
+            'latitude': columns['latitude'][start:stop],
+            'longitude': columns['longitude'][start:stop],
+            'area_acres': columns['area_acres'][start:stop],
+            'date': columns['dates'][start:stop],
+        })
+
+    def _day_start(self, date):
+        k = bisect.bisect_left(self._day_values, _as_day(date))
+        return self._day_starts[k] if k < len(self._day_starts) else self._n
+
+    def _day_stop(self, date):
+        k = bisect.bisect_right(self._day_values, _as_day(date))
+        return self._day_starts[k] if k < len(self._day_starts) else self._n
+
+
+def aggregate_hotspot_chunks(chunks):
+    """Fold raw hotspot chunks into an aggregates-only ``SeverityStore``.
+
+    Only the running aggregates (days x severities) and the current chunk
+    are ever held in memory.
+    """
+    store = SeverityStore(keep_rows=False)
+    for chunk in chunks:
+        store.append_hotspots(chunk)
+    return store
+
+
+def read_summary_chunks(csv_file, max_memory_bytes):
+    """Iterate over ``csv_file`` in chunks sized to stay under ``max_memory_bytes``"""
+    rows = max(1_000, max_memory_bytes // BYTES_PER_ROW)
+    return pd.read_csv(csv_file, usecols=SUMMARY_COLUMNS, chunksize=rows)
+
+
+def empty_summary():
+    index = pd.MultiIndex.from_arrays(
+        [pd.DatetimeIndex([], dtype='datetime64[us]'),
+         pd.CategoricalIndex([], categories=SEVERITY_LABELS, ordered=True)],
+        names=['date', 'severity'])
+    return pd.DataFrame({'count': np.array([], dtype=np.int64),
+                         'area_acres': np.array([], dtype=np.float64)}, index=index)
+
+
+def _as_day(date):
+    return np.datetime64(pd.Timestamp(date).date(), 'D')
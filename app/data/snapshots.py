@@ -0,0 +1,144 @@
+"""
+Columnar snapshots of the parsed dashboard tables and arrays derived from them.
+
+Each table is written once as an uncompressed Arrow IPC file next to the
+asset cache, keyed by the content digest of the CSV it was parsed from. Later
+loads memory-map the file instead of re-parsing the text, so start-up cost no
+longer grows with the number of rows. A snapshot is stale, and is rebuilt
+from the CSV, as soon as the cached CSV's digest or ``SNAPSHOT_VERSION``
+changes. Precomputed NumPy arrays (such as the hotspot cube) are kept the
+same way, as uncompressed ``.npz`` files.
+"""
+
+import glob
+import os
+import tempfile
+
+import numpy as np
+import pyarrow as pa
+
+# Bump whenever the post-parse preparation of a table changes
+SNAPSHOT_VERSION = 3
+
+# Matches the categorical columns produced by data.hotspots.normalize_hotspots
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+# Explicit column types per table; columns not listed keep their inferred type
+SCHEMAS = {
+    'fire_hotspots': {
+        'latitude': pa.float64(),
+        'longitude': pa.float64(),
+        'brightness': pa.float32(),
+        'scan': pa.float32(),
+        'track': pa.float32(),
+        'acq_date': pa.timestamp('us'),
+        'acq_time': pa.int16(),
+        'acq_datetime': pa.timestamp('us'),
+        'satellite': CATEGORY,
+        'instrument': CATEGORY,
+        'confidence': CATEGORY,
+        'version': CATEGORY,
+        'bright_t31': pa.float32(),
+        'frp': pa.float32(),
+        'daynight': CATEGORY,
+    },
+    'veg_processed': {
+        'Class_Cnam': pa.string(),
+        'Total_Area': pa.float64(),
+        'Total_Burnt_Area': pa.float64(),
+        'Total_Proportion_Burn': pa.float64(),
+        **{f'Area_of_Burn{i}': pa.float64() for i in range(1, 7)},
+        **{f'Proportion_of_burn_{i}': pa.float64() for i in range(1, 7)},
+    },
+    'trees_withburn': {
+        'system:index': pa.string(),
+        'category': pa.string(),
+        'id': pa.int64(),
+        'place': pa.string(),
+        'species': pa.string(),
+        'sum': pa.int64(),
+        '.geo': pa.string(),
+    },
+    'trees_processed': {
+        'category': pa.string(),
+        'Burnt': pa.int64(),
+        'Not Burnt': pa.int64(),
+        'Total number of trees': pa.int64(),
+    },
+}
+
+
+class SnapshotStore:
+    def __init__(self, snapshot_dir):
+        self.snapshot_dir = snapshot_dir
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+
+    def path(self, name, digest, suffix='arrow'):
+        return os.path.join(self.snapshot_dir, f"{name}-v{SNAPSHOT_VERSION}-{digest}.{suffix}")
+
+    def load(self, name, digest):
+        """Return the snapshot of ``name`` built from ``digest``, or ``None`` if missing."""
+        if digest is None:
+            return None
+        path = self.path(name, digest)
+        if not os.path.exists(path):
+            return None
+        with pa.memory_map(path, 'r') as source:
+            table = pa.ipc.open_file(source).read_all()
+        # split_blocks avoids consolidating columns into 2-D blocks, which
+        # lets numeric columns be handed over without an extra copy
+        return table.to_pandas(split_blocks=True)
+
+    def save(self, name, digest, df):
+        """Write ``df`` as the snapshot of ``name`` and drop snapshots of older digests."""
+        if digest is None or df.empty:
+            return
+        table = self.to_table(name, df)
+
+        def write(sink):
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        self._write(name, self.path(name, digest), write)
+
+    def load_arrays(self, name, digest):
+        """Return the arrays saved as ``name`` for ``digest`` as a dict, or ``None`` if missing."""
+        if digest is None:
+            return None
+        path = self.path(name, digest, 'npz')
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as arrays:
+            return {key: arrays[key] for key in arrays.files}
+
+    def save_arrays(self, name, digest, arrays):
+        """Write a dict of arrays as ``name`` for ``digest`` and drop older versions."""
+        if digest is None:
+            return
+        self._write(name, self.path(name, digest, 'npz'), lambda sink: np.savez(sink, **arrays))
+
+    def _write(self, name, path, write):
+        """Atomically create ``path`` with ``write(file)`` and remove its stale siblings"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.snapshot_dir)
+        try:
+            with os.fdopen(fd, 'wb') as sink:
+                write(sink)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        suffix = os.path.splitext(path)[1]
+        for stale in glob.glob(os.path.join(self.snapshot_dir, f"{glob.escape(name)}-v*{suffix}")):
+            if stale != path:
+                os.remove(stale)
+
+    def to_table(self, name, df):
+        """Convert ``df`` to Arrow, casting the columns listed in ``SCHEMAS[name]``."""
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        types = SCHEMAS.get(name, {})
+        fields = [
+            pa.field(field.name, types.get(field.name, field.type))
+            for field in table.schema
+        ]
+        return table.cast(pa.schema(fields))
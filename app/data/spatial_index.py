@@ -0,0 +1,188 @@
+"""
+Multi-resolution quadkey index over hotspot coordinates.
+
+Every row is assigned once to its Web Mercator tile at ``MAX_LEVEL`` and the
+tile's quadkey is stored as a Morton (Z-order) integer. Rows are kept in
+quadkey order next to their positions in the source frame, so the tile of a
+row at any coarser level is a right shift of its code, and every tile at any
+level is one contiguous run of the sorted codes. Bounding boxes are covered
+by a bounded number of tiles, each found with ``searchsorted``; only rows in
+tiles straddling the box edge are tested against the exact coordinates, so
+queries cost O(log n + result) rather than a scan of ``latitude`` and
+``longitude``. Per-tile aggregation at any level is a ``reduceat`` over the
+same order.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Finest tile level; level-24 tiles are ~2.4 m across at the equator
+MAX_LEVEL = 24
+
+# Mercator latitude limit, beyond which tiles are undefined
+MAX_LATITUDE = 85.05112878
+
+# A query box is covered by at most this many tiles per axis
+COVER_TILES = 16
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def tile_xy(latitude, longitude, level=MAX_LEVEL):
+    """Web Mercator tile column and row of each coordinate at ``level``"""
+    n = 2 ** level
+    lat = np.radians(np.clip(np.asarray(latitude, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE))
+    x = (np.asarray(longitude, dtype=np.float64) + 180.0) / 360.0
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / np.pi) / 2.0
+    return (np.clip((x * n).astype(np.int64), 0, n - 1),
+            np.clip((y * n).astype(np.int64), 0, n - 1))
+
+
+def interleave(x, y):
+    """Morton code of tile columns ``x`` and rows ``y`` (y bits above x bits)"""
+    return (_spread_bits(y) << np.uint64(1)) | _spread_bits(x)
+
+
+def quadkey(cell, level):
+    """Bing-style quadkey string of an interleaved tile code at ``level``"""
+    return ''.join(str((int(cell) >> (2 * (level - 1 - i))) & 3) for i in range(level))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km, vectorized over NumPy arrays"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class QuadkeyIndex:
+    def __init__(self, df, max_level=MAX_LEVEL):
+        """Index the ``latitude``/``longitude`` of ``df``; ``df`` itself is not copied"""
+        self.df = df
+        self.max_level = max_level
+        if df.empty:
+            lat = lon = np.array([], dtype=np.float64)
+        else:
+            lat = df['latitude'].to_numpy(np.float64)
+            lon = df['longitude'].to_numpy(np.float64)
+        codes = interleave(*tile_xy(lat, lon, max_level))
+        self.order = np.argsort(codes, kind='stable')
+        self.codes = codes[self.order]
+        self.latitude = lat[self.order]
+        self.longitude = lon[self.order]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def bbox_positions(self, bounds, stop=None):
+        """Sorted positions in ``df`` of rows inside ``(west, south, east, north)``.
+
+        With ``stop``, only positions below it are returned, which restricts
+        the query to a prefix of ``df`` such as ``TimeIndex.upto`` returns.
+        """
+        west, south, east, north = bounds
+        candidates, edge = self._cover(bounds)
+        if len(candidates) == 0:
+            return candidates
+        lat, lon = self.latitude[candidates], self.longitude[candidates]
+        inside = ~edge | ((lon >= west) & (lon <= east) & (lat >= south) & (lat <= north))
+        positions = self.order[candidates[inside]]
+        if stop is not None:
+            positions = positions[positions < stop]
+        return np.sort(positions)
+
+    def bbox(self, bounds, stop=None):
+        """Rows of ``df`` inside ``(west, south, east, north)``, in their original order"""
+        return self.df.iloc[self.bbox_positions(bounds, stop)]
+
+    def radius_positions(self, latitude, longitude, radius_km, stop=None):
+        """Sorted positions in ``df`` of rows within ``radius_km`` of a point"""
+        dlat = np.degrees(radius_km / EARTH_RADIUS_KM)
+        dlon = dlat / max(np.cos(np.radians(min(abs(latitude) + dlat, 90.0))), 1e-12)
+        positions = self.bbox_positions(
+            (longitude - dlon, latitude - dlat, longitude + dlon, latitude + dlat), stop)
+        # Positions are into df, so look the coordinates up there
+        lat = self.df['latitude'].to_numpy(np.float64)[positions]
+        lon = self.df['longitude'].to_numpy(np.float64)[positions]
+        return positions[haversine_km(latitude, longitude, lat, lon) <= radius_km]
+
+    def radius(self, latitude, longitude, radius_km, stop=None):
+        """Rows of ``df`` within ``radius_km`` of a point, in their original order"""
+        return self.df.iloc[self.radius_positions(latitude, longitude, radius_km, stop)]
+
+    def aggregate(self, level, columns=None, positions=None):
+        """Per-tile ``count`` plus the max of ``columns`` at any ``level``.
+
+        ``positions`` (e.g. from ``bbox_positions``) limits the aggregation
+        to those rows. Returns one row per non-empty tile with its interleaved
+        ``cell`` code, ``quadkey``, centre ``latitude``/``longitude`` and the
+        aggregates.
+        """
+        columns = [column for column in (columns or []) if column in self.df]
+        if positions is None:
+            sorted_rows = np.arange(len(self.codes))
+        else:
+            # Back to index order, where tiles are contiguous
+            rank = np.empty(len(self.order), dtype=np.int64)
+            rank[self.order] = np.arange(len(self.order))
+            sorted_rows = np.sort(rank[positions])
+
+        cells = self.codes[sorted_rows] >> np.uint64(2 * (self.max_level - level))
+        starts = (np.flatnonzero(np.r_[True, cells[1:] != cells[:-1]])
+                  if len(cells) else np.array([], dtype=np.int64))
+        unique_cells = cells[starts]
+        x, y = _compact_bits(unique_cells), _compact_bits(unique_cells >> np.uint64(1))
+        n = 2 ** level
+        result = pd.DataFrame({
+            'cell': unique_cells,
+            'quadkey': [quadkey(cell, level) for cell in unique_cells],
+            'latitude': np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + 0.5) / n)))),
+            'longitude': (x + 0.5) / n * 360.0 - 180.0,
+            'count': np.diff(np.append(starts, len(cells))),
+        })
+        for column in columns:
+            values = self.df[column].to_numpy(np.float64)[self.order[sorted_rows]]
+            result[column] = np.fmax.reduceat(values, starts) if len(starts) else values[:0]
+        return result
+
+    def _cover(self, bounds):
+        """Index-order rows in tiles covering ``bounds``, and whether each tile straddles its edge"""
+        west, south, east, north = bounds
+        if len(self.codes) == 0 or west > east or south > north:
+            return np.array([], dtype=np.int64), np.array([], dtype=bool)
+
+        # Coarsest level at which the box spans at most COVER_TILES tiles per axis
+        x0, y1 = tile_xy(south, west, self.max_level)
+        x1, y0 = tile_xy(north, east, self.max_level)
+        span = max(int(x1 - x0), int(y1 - y0), 1)
+        level = int(np.clip(self.max_level - np.ceil(np.log2(span / COVER_TILES)), 0, self.max_level))
+        shift = self.max_level - level
+
+        xs = np.arange(x0 >> shift, (x1 >> shift) + 1, dtype=np.int64)
+        ys = np.arange(y0 >> shift, (y1 >> shift) + 1, dtype=np.int64)
+        grid_x, grid_y = np.meshgrid(xs, ys)
+        tiles = interleave(grid_x.ravel(), grid_y.ravel())
+        interior = ((grid_x > xs[0]) & (grid_x < xs[-1]) & (grid_y > ys[0]) & (grid_y < ys[-1])).ravel()
+
+        lo = np.searchsorted(self.codes, tiles << np.uint64(2 * shift), side='left')
+        hi = np.searchsorted(self.codes, (tiles + np.uint64(1)) << np.uint64(2 * shift), side='left')
+        lengths = hi - lo
+        rows = np.repeat(lo - np.cumsum(np.r_[0, lengths[:-1]]), lengths) + np.arange(lengths.sum())
+        return rows, np.repeat(~interior, lengths)
+
+
+def _spread_bits(values):
+    v = np.asarray(values).astype(np.uint64) & np.uint64(0xFFFFFFFF)
+    for shift, mask in [(16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF),
+                        (4, 0x0F0F0F0F0F0F0F0F), (2, 0x3333333333333333), (1, 0x5555555555555555)]:
+        v = (v | (v << np.uint64(shift))) & np.uint64(mask)
+    return v
+
+
+def _compact_bits(values):
+    v = np.asarray(values).astype(np.uint64) & np.uint64(0x5555555555555555)
+    for shift, mask in [(1, 0x3333333333333333), (2, 0x0F0F0F0F0F0F0F0F), (4, 0x00FF00FF00FF00FF),
+                        (8, 0x0000FFFF0000FFFF), (16, 0x00000000FFFFFFFF)]:
+        v = (v | (v >> np.uint64(shift))) & np.uint64(mask)
+    return v.astype(np.int64)
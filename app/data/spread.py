@@ -0,0 +1,143 @@
+"""
+Fire arrival-time surface and rate of spread derived from hotspots.
+
+Each detection marks when the fire had reached its location. Detections
+are reduced to the earliest one per fine cell, put in a KD-tree (in local
+kilometres), and the arrival time of every cell of a regular grid is
+interpolated from its nearest detections by inverse-distance weighting;
+cells with no detection within ``max_distance_km`` are left unburned (NaN).
+The gradient of the arrival-time surface gives the rate of spread (the
+inverse of its magnitude, km/h) and the direction the fire moved (along
+the gradient, as an azimuth). All steps are vectorized over the grid, and
+the KD-tree queries run on every core.
+
+Grid rows are evenly spaced in Web Mercator y so the surface can be laid
+over web maps as an image without resampling. The grid is dense over the
+bounding box of all detections, so when ``cell_km`` would need more than
+``max_cells`` cells (e.g. fires far apart) the cells are coarsened to fit.
+"""
+
+import numpy as np
+import pandas as pd
+from data.raster import mercator_y
+from scipy.spatial import cKDTree
+
+KM_PER_DEGREE = 111.32
+KM2_TO_ACRES = 247.105
+
+# Gradients below this (h/km) would mean faster than ~20 km/h; treat as noise
+MIN_GRADIENT = 0.05
+
+
+class SpreadSurface:
+    def __init__(self, bounds, start, arrival, ros, direction, cell_km2):
+        self.bounds = bounds  # (west, south, east, north) of the grid
+        self.start = start  # Timestamp that arrival hours count from
+        self.arrival = arrival  # hours after ``start``, NaN where unburned; row 0 is the north
+        self.ros = ros  # rate of spread, km/h
+        self.direction = direction  # degrees clockwise from north the fire moved towards
+        self.cell_km2 = cell_km2  # area of each cell, per row
+
+    @classmethod
+    def from_hotspots(cls, df, cell_km=0.2, neighbours=8, power=2.0, max_distance_km=0.75, max_cells=None):
+        """Interpolate the arrival-time surface of ``df`` (``latitude``, ``longitude``, ``acq_datetime``).
+
+        With ``max_cells``, ``cell_km`` grows until the grid fits; the search
+        radius grows with it so coarse cells still reach their detections.
+        """
+        lat = df['latitude'].to_numpy(np.float64)
+        lon = df['longitude'].to_numpy(np.float64)
+        times = df['acq_datetime'].to_numpy('datetime64[s]')
+        start = times.min()
+        hours = (times - start).astype(np.float64) / 3600
+
+        # Local equirectangular kilometres around the fire
+        lat0 = np.radians(lat.mean())
+        kx = KM_PER_DEGREE * np.cos(lat0)
+        x, y = lon * kx, lat * KM_PER_DEGREE
+
+        width_km, height_km = (lon.max() - lon.min()) * kx, (lat.max() - lat.min()) * KM_PER_DEGREE
+        requested = cell_km
+
+        def grid_cells():
+            return ((width_km + 2 * max_distance_km) / cell_km + 1) * ((height_km + 2 * max_distance_km) / cell_km + 1)
+
+        while max_cells is not None and grid_cells() > max_cells and cell_km < max(width_km, height_km):
+            cell_km *= 2
+            max_distance_km = max(max_distance_km, cell_km)
+        if cell_km != requested:
+            print(f"Spread surface coarsened from {requested} to {cell_km} km cells "
+                  f"to stay within {max_cells:,} cells")
+
+        # First arrival per cell, so re-detections of burning ground don't pull times later
+        fine = np.floor(x / (cell_km / 2)).astype(np.int64) * 2 ** 32 + np.floor(y / (cell_km / 2)).astype(np.int64)
+        order = np.lexsort((hours, fine))
+        first = order[np.r_[True, fine[order][1:] != fine[order][:-1]]]
+        tree = cKDTree(np.column_stack([x[first], y[first]]))
+        point_hours = hours[first]
+
+        pad = max_distance_km / KM_PER_DEGREE
+        west, east = lon.min() - pad / np.cos(lat0), lon.max() + pad / np.cos(lat0)
+        south, north = lat.min() - pad, lat.max() + pad
+        n_cols = max(int(np.ceil((east - west) * kx / cell_km)), 2)
+        n_rows = max(int(np.ceil((north - south) * KM_PER_DEGREE / cell_km)), 2)
+        col_lon = west + (np.arange(n_cols) + 0.5) * (east - west) / n_cols
+        merc = mercator_y(north) - (np.arange(n_rows) + 0.5) * (mercator_y(north) - mercator_y(south)) / n_rows
+        row_lat = np.degrees(2 * np.arctan(np.exp(merc)) - np.pi / 2)
+
+        grid_x, grid_y = np.meshgrid(col_lon * kx, row_lat * KM_PER_DEGREE)
+        k = min(neighbours, len(first))
+        distance, index = tree.query(np.column_stack([grid_x.ravel(), grid_y.ravel()]), k=k,
+                                     distance_upper_bound=max_distance_km, workers=-1)
+        distance, index = distance.reshape(-1, k), index.reshape(-1, k)
+        found = np.isfinite(distance)
+        weights = np.where(found, 1 / np.maximum(distance, cell_km / 10) ** power, 0)
+        values = point_hours[np.where(found, index, 0)]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            arrival = ((weights * values).sum(axis=1) / weights.sum(axis=1)).reshape(n_rows, n_cols)
+
+        ros, direction = rate_of_spread(arrival, row_lat * KM_PER_DEGREE, (east - west) / n_cols * kx)
+        cell_km2 = (east - west) / n_cols * kx * np.abs(np.gradient(row_lat * KM_PER_DEGREE))
+        return cls((west, south, east, north), pd.Timestamp(start), arrival, ros, direction, cell_km2)
+
+    def summary(self):
+        """Per-day newly burned area and rate of spread (median, p90, max) with the mean heading"""
+        hours_into_first_day = (self.start - self.start.normalize()) / pd.Timedelta(hours=1)
+        day = np.floor((hours_into_first_day + self.arrival) / 24)
+        burned = np.isfinite(self.arrival)
+        days = day[burned].astype(np.int64)
+        areas = np.broadcast_to(self.cell_km2[:, None], self.arrival.shape)[burned]
+        ros = self.ros[burned]
+        heading = np.radians(self.direction[burned])
+
+        rows = []
+        for offset in np.unique(days):
+            on_day = days == offset
+            speeds = ros[on_day][np.isfinite(ros[on_day])]
+            angles = heading[on_day][np.isfinite(heading[on_day])]
+            rows.append({
+                'date': self.start.normalize() + pd.Timedelta(days=int(offset)),
+                'new_area_acres': areas[on_day].sum() * KM2_TO_ACRES,
+                'ros_median_kmh': np.median(speeds) if len(speeds) else np.nan,
+                'ros_p90_kmh': np.percentile(speeds, 90) if len(speeds) else np.nan,
+                'ros_max_kmh': speeds.max() if len(speeds) else np.nan,
+                'direction_deg': (np.degrees(np.arctan2(np.sin(angles).sum(), np.cos(angles).sum())) % 360
+                                  if len(angles) else np.nan),
+            })
+        return pd.DataFrame(rows).set_index('date') if rows else pd.DataFrame(
+            columns=['new_area_acres', 'ros_median_kmh', 'ros_p90_kmh', 'ros_max_kmh', 'direction_deg'])
+
+
+def rate_of_spread(arrival, row_km, col_km):
+    """Spread speed (km/h) and heading (degrees from north) from an arrival-time grid in hours.
+
+    ``row_km`` are the northings of the grid rows (row 0 at the north),
+    ``col_km`` the column spacing. Cells where the surface is flat enough to
+    imply implausible speeds, or unburned, get NaN.
+    """
+    d_north, d_east = np.gradient(arrival, row_km, col_km)
+    magnitude = np.hypot(d_north, d_east)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ros = np.where(magnitude >= MIN_GRADIENT, 1 / magnitude, np.nan)
+    direction = np.where(np.isfinite(ros), np.degrees(np.arctan2(d_east, d_north)) % 360, np.nan)
+    return ros, direction
@@ -0,0 +1,58 @@
+"""
+Day-boundary index over frames kept sorted by a timestamp column.
+
+Cutoff and range queries become two ``searchsorted`` calls and a positional
+slice, instead of building a ``date`` object per row and a boolean mask over
+the whole frame.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def sort_by_time(df, column):
+    """Return ``df`` stably sorted by ``column`` with a fresh RangeIndex"""
+    if df.empty or df[column].is_monotonic_increasing:
+        return df.reset_index(drop=True)
+    return df.sort_values(column, kind='stable').reset_index(drop=True)
+
+
+class TimeIndex:
+    def __init__(self, df, column):
+        """Index ``df``, which must already be sorted by ``column``"""
+        self.df = df
+        self.column = column
+        if df.empty:
+            self.times = np.array([], dtype='datetime64[us]')
+        else:
+            self.times = df[column].to_numpy(dtype='datetime64[us]')
+
+        # First row of every distinct day, plus the end of the frame
+        days = self.times.astype('datetime64[D]')
+        starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]]) if len(days) else np.array([], dtype=np.int64)
+        self.days = days[starts]
+        self.offsets = np.append(starts, len(days))
+
+    def upto(self, date):
+        """Rows on or before the calendar day ``date`` (cumulative view)"""
+        return self.df.iloc[:self._day_stop(date)]
+
+    def between(self, start, end):
+        """Rows whose calendar day lies in the inclusive range [``start``, ``end``]"""
+        return self.df.iloc[self._day_start(start):self._day_stop(end)]
+
+    def between_times(self, start, end):
+        """Rows with ``start <= column < end`` for arbitrary timestamps"""
+        lo = np.searchsorted(self.times, np.datetime64(pd.Timestamp(start), 'us'), side='left')
+        hi = np.searchsorted(self.times, np.datetime64(pd.Timestamp(end), 'us'), side='left')
+        return self.df.iloc[lo:hi]
+
+    def _day_start(self, date):
+        return self.offsets[np.searchsorted(self.days, _as_day(date), side='left')]
+
+    def _day_stop(self, date):
+        return self.offsets[np.searchsorted(self.days, _as_day(date), side='right')]
+
+
+def _as_day(date):
+    return np.datetime64(pd.Timestamp(date).date(), 'D')
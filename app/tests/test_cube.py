@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data.cube import HotspotCube
+
+BOXES = [
+    (-118.45, 34.05, -118.35, 34.15),
+    (-118.60, 34.00, -118.50, 34.10),
+    (-118.37, 34.11, -118.36, 34.12),
+    (-119.00, 33.00, -118.00, 35.00),
+]
+
+
+@pytest.fixture(scope='module')
+def hotspots():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    # Rounded to 1e-3 degrees so many detections sit exactly on cell boundaries
+    return pd.DataFrame({
+        'longitude': np.round(rng.uniform(-118.62, -118.30, n), 3),
+        'latitude': np.round(rng.uniform(33.98, 34.20, n), 3),
+        'acq_date': pd.Timestamp('2025-01-07') + pd.to_timedelta(rng.integers(0, 10, n), unit='D'),
+        'frp': rng.uniform(0, 50, n),
+    })
+
+
+def brute_force(df, bounds, start=None, end=None):
+    west, south, east, north = bounds
+    mask = ((df['longitude'] >= west) & (df['longitude'] < east)
+            & (df['latitude'] >= south) & (df['latitude'] < north))
+    if start is not None:
+        mask &= df['acq_date'] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df['acq_date'] <= pd.Timestamp(end)
+    return df[mask]
+
+
+@pytest.mark.parametrize('bounds', BOXES)
+def test_grid_aligned_boxes_match_brute_force(hotspots, bounds):
+    cube = HotspotCube.build(hotspots, 0.01)
+    expected = brute_force(hotspots, bounds)
+    assert cube.count(bounds) == len(expected)
+    assert cube.frp(bounds) == pytest.approx(expected['frp'].sum())
+
+    window = brute_force(hotspots, bounds, '2025-01-09', '2025-01-12')
+    assert cube.count(bounds, '2025-01-09', '2025-01-12') == len(window)
+    daily = cube.daily_counts(bounds)
+    assert daily.sum() == len(expected)
+
+
+def test_round_trip_through_arrays(hotspots):
+    cube = HotspotCube.build(hotspots, 0.01)
+    restored = HotspotCube.from_arrays(cube.to_arrays())
+    assert restored.origin == cube.origin
+    for bounds in BOXES:
+        assert restored.count(bounds) == cube.count(bounds)
+
+
+def test_coarsened_cube_snaps_boxes_outward(hotspots):
+    cube = HotspotCube.build(hotspots, 0.01, max_cells=2_000)
+    assert cube.cell_degrees > 0.01
+    assert cube.count() == len(hotspots)
+    for bounds in BOXES:
+        assert cube.count(bounds) >= len(brute_force(hotspots, bounds))
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data.cache import AssetCache
+from data.data_loader import DataLoader
+from data.energy import EnergyGrid, accumulate_energy
+from data.hotspots import normalize_hotspots
+from data.registry import DatasetRegistry
+from data.severity import SeverityStore
+from data.time_index import sort_by_time
+
+
+def raw_hotspots(days, seed):
+    rng = np.random.default_rng(seed)
+    n = 40 * len(days)
+    return pd.DataFrame({
+        'latitude': rng.uniform(34.00, 34.03, n),
+        'longitude': rng.uniform(-118.55, -118.52, n),
+        'acq_date': np.repeat(days, 40),
+        'acq_time': rng.choice([945, 1030, 2100], n),
+        'brightness': rng.uniform(300, 400, n),
+        'scan': rng.uniform(0.3, 0.6, n),
+        'track': rng.uniform(0.3, 0.6, n),
+        'frp': rng.uniform(0, 40, n),
+    })
+
+
+@pytest.fixture
+def loader(tmp_path):
+    loader = DataLoader(cache=AssetCache(cache_dir=str(tmp_path)), registry=DatasetRegistry())
+    # Stand-ins for the shared datasets, so nothing is downloaded
+    loader.severity_store = SeverityStore()
+    loader.fire_energy = EnergyGrid()
+    return loader
+
+
+def test_late_batch_lands_in_both_stores(loader):
+    recent = raw_hotspots(['2025-01-10', '2025-01-11'], 0)
+    late = raw_hotspots(['2025-01-08', '2025-01-09'], 1)
+    loader.append_hotspots(recent)
+    loader.append_hotspots(late)
+
+    assert loader.severity_store.totals()['count'].sum() == len(recent) + len(late)
+    assert len(loader.severity_store.frame()) == len(recent) + len(late)
+
+    in_order = EnergyGrid()
+    accumulate_energy(sort_by_time(normalize_hotspots(pd.concat([late, recent], ignore_index=True)),
+                                   'acq_datetime'), in_order)
+    assert loader.fire_energy.total == pytest.approx(in_order.total)
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data.energy import EnergyGrid, accumulate_energy
+
+
+def hotspots(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'latitude': rng.uniform(34.00, 34.05, n),
+        'longitude': rng.uniform(-118.55, -118.50, n),
+        'acq_datetime': pd.Timestamp('2025-01-07') + pd.to_timedelta(rng.integers(0, 6 * 24, n) * 3600, unit='s'),
+        'frp': rng.uniform(0, 40, n),
+    }).sort_values('acq_datetime', kind='stable', ignore_index=True)
+
+
+def test_late_batch_matches_in_order_build():
+    df = hotspots(3000, 0)
+    cutoff = pd.Timestamp('2025-01-10')
+    # Everything after the cutoff arrives first, then the detections it missed
+    early, late = df[df['acq_datetime'] < cutoff], df[df['acq_datetime'] >= cutoff]
+
+    in_order = EnergyGrid()
+    accumulate_energy(df, in_order)
+
+    grid = EnergyGrid()
+    added = accumulate_energy(late, grid).sum()
+    added += accumulate_energy(early, grid).sum()
+
+    assert grid.total == pytest.approx(in_order.total)
+    assert added == pytest.approx(grid.total)
+    west, south, _, _ = grid.bounds
+    r0 = round((south - in_order.bounds[1]) / grid.cell_degrees)
+    c0 = round((west - in_order.bounds[0]) / grid.cell_degrees)
+    expected = in_order.energy[r0:r0 + grid.energy.shape[0], c0:c0 + grid.energy.shape[1]]
+    np.testing.assert_allclose(grid.energy, expected, atol=1e-9)
+
+    # Later batches continue from the re-integrated cells
+    tail = hotspots(200, 1).assign(acq_datetime=lambda d: d['acq_datetime'] + pd.Timedelta(days=6))
+    accumulate_energy(tail, in_order)
+    accumulate_energy(tail, grid)
+    assert grid.total == pytest.approx(in_order.total)
+
+
+def test_same_overpass_is_folded_not_double_counted():
+    df = hotspots(500, 2)
+    grid = EnergyGrid()
+    accumulate_energy(df, grid)
+    repeat = df.iloc[-1:].assign(frp=0.0)
+    before = grid.total
+    accumulate_energy(repeat, grid)
+    assert grid.total == pytest.approx(before)
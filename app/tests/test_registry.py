@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data.registry import DatasetRegistry
+
+
+class Owner:
+    def __init__(self, session_id):
+        self.session_id = session_id
+
+
+def test_failed_load_is_not_cached():
+    registry = DatasetRegistry()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return None if len(calls) == 1 else pd.DataFrame({'a': [1, 2]})
+
+    assert registry.get_or_load('k', loader) is None
+    assert 'k' not in registry
+    assert registry.stats()['datasets'] == 0
+
+    value = registry.get_or_load('k', loader)
+    assert value['a'].tolist() == [1, 2]
+    assert registry.get_or_load('k', loader) is value
+    assert len(calls) == 2
+
+
+def test_shared_value_is_frozen_and_counts_sessions():
+    registry = DatasetRegistry()
+    owners = [Owner('s1'), Owner('s1'), Owner('s2')]
+    for owner in owners:
+        value = registry.get_or_load('k', lambda: np.zeros(4), owner)
+    with pytest.raises(ValueError):
+        value[0] = 1
+    stats = registry.stats()
+    assert stats['sessions'] == 2
+    assert stats['saved_bytes'] == value.nbytes
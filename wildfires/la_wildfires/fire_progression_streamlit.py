@@ -1,9 +1,16 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import requests
 import io
 
+# Reuse the dashboard's hotspot normalization (app/data/hotspots.py)
+sys.path.append(str(Path(__file__).resolve().parents[2] / "app"))
+from data.hotspots import normalize_hotspots
+
 # Google Cloud Storage URL (ensure it is publicly accessible or use signed URLs)
 CSV_URL = "https://storage.googleapis.com/localsolve_assets/la_wildfires_jan_2025/filtered_la_january_2025_fire_hotspots_combined.csv"
 
@@ -13,13 +20,10 @@ def load_data():
     response = requests.get(CSV_URL)
     if response.status_code == 200:
         csv_data = response.content  # Get binary content
-        df = pd.read_csv(io.StringIO(csv_data.decode("utf-8")))  # Read into pandas
-        df['acq_date'] = pd.to_datetime(df['acq_date'])  # Convert to datetime
-        
-        # Add acq_time as hour and minute to acq_date
-        df['acq_datetime'] = df['acq_date'] + pd.to_timedelta(df['acq_time'].astype(str).str.zfill(4).str[:2] + ':' + df['acq_time'].astype(str).str.zfill(4).str[2:] + ':00')
+        df = pd.read_csv(io.BytesIO(csv_data))  # Read into pandas
         
-        return df
+        # Parse acq_date and add acq_time as hour and minute to it
+        return normalize_hotspots(df)
     else:
         st.error("Failed to load data. Please check the file URL.")
         return pd.DataFrame()  # Return empty DataFrame if request fails
@@ -1,12 +1,31 @@
+import argparse
+import contextlib
 import datetime
+import glob
+import hashlib
+import http.client
+import io
+import itertools
+import json
 import logging
+import math
 import os
+import random
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from tempfile import mkdtemp
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 import geopandas as gpd
+import numpy as np
 import pandas as pd
-import urllib
+import urllib.error
+import urllib.request
+
+try:
+    import fcntl
+except ImportError:  # Windows: one writer at a time is up to the caller
+    fcntl = None
 
 logging.basicConfig(
     format='%(asctime)s %(levelname)-8s %(message)s',
@@ -18,13 +37,30 @@ logger = logging.getLogger(__name__)
 class Settings:
     """Class for storing config and global variables for this ingest script."""
     temp_dir: str = mkdtemp()
-    output_shp_filename = 'VIIRS_Merged_URT_Custom_BBOX_24h.shp'
+    output_basename: str = 'VIIRS_Merged_URT_Custom_BBOX_24h'
+    output_format: str = 'geoparquet'  # any key of WRITERS
+    output_row_group_size: int = 10000  # GeoParquet rows per row group, the unit bbox reads skip over
+    store_dir: str = os.path.expanduser('~/.cache/localsolve/firms_detections')
+    store_index_hours: int = 72  # how far behind a satellite's watermark late detections are still checked
     satellites: List[str] = ['snpp', 'noaa20']
     firms_wfs_url_prefix: str = 'https://firms.modaps.eosdis.nasa.gov/mapserver/wfs'
     firms_wfs_url_suffix: str = '?SERVICE=WFS&REQUEST=GetFeature&VERSION=2.0.0&TYPENAME=ms:fires_<satellite>_24hrs&' + \
-                                'STARTINDEX=0&COUNT=100000&SRSNAME=urn:ogc:def:crs:EPSG::4326&' + \
+                                'STARTINDEX=0&COUNT=<count>&SRSNAME=urn:ogc:def:crs:EPSG::4326&' + \
                                 'BBOX=<bbox>&outputformat=csv'
-    firms_wfs_request_sleep_secs: int = 5
+    firms_wfs_count: int = 100000  # most features one WFS request returns; tiles that hit it are split
+    firms_tile_degrees: float = 10.0  # size of the tiles a bbox is first split into
+    firms_min_tile_degrees: float = 0.25  # tiles this small are not split further, even when capped
+    firms_max_workers: int = min(32, (os.cpu_count() or 1) * 4)
+    firms_wfs_timeout_secs: int = 120
+    firms_transactions_per_key: int = 5000  # FIRMS allows 5000 transactions per MAP_KEY every 10 minutes
+    firms_transaction_window_secs: int = 600
+    firms_max_retries: int = 5
+    firms_backoff_base_secs: float = 2.0  # retries wait up to base * 2 ** attempt, with full jitter
+    firms_backoff_max_secs: float = 60.0
+    firms_area_url: str = 'https://firms.modaps.eosdis.nasa.gov/api/area/csv/<map_key>/<source>/<bbox>/<days>/<date>'
+    backfill_sources: Dict[str, str] = {'snpp': 'VIIRS_SNPP_SP', 'noaa20': 'VIIRS_NOAA20_SP'}  # archived products
+    backfill_window_days: int = 5  # the area API serves at most this many days per request
+    backfill_dir: str = os.path.expanduser('~/.cache/localsolve/firms_backfill')
     firms_api_map_keys: List[str] = [  # Need two since this ingest exceeds the 500 point transaction limit
   #Use the API MAP key
     ]
@@ -33,8 +69,422 @@ class Settings:
 config = Settings()
 
 
+class TokenBucket:
+    """Thread-safe token bucket allowing ``capacity`` calls per ``window_secs``, in bursts of up to ``capacity``."""
+
+    def __init__(self, capacity: int, window_secs: float):
+        self.capacity = capacity
+        self.refill_per_sec = capacity / window_secs
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens: int = 1):
+        """Block until ``tokens`` are available, then take them."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_sec)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.refill_per_sec
+            time.sleep(wait)
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def rate_limiter(map_key: str) -> TokenBucket:
+    """The process-wide token bucket of a FIRMS MAP_KEY, so every request made with it shares its limit."""
+    with _buckets_lock:
+        if map_key not in _buckets:
+            _buckets[map_key] = TokenBucket(config.firms_transactions_per_key, config.firms_transaction_window_secs)
+        return _buckets[map_key]
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Seconds to wait before retry ``attempt`` (1-based): the server's Retry-After, else full-jitter exponential."""
+    if retry_after is not None and retry_after.isdigit():
+        return float(retry_after)
+    return random.uniform(0, min(config.firms_backoff_max_secs, config.firms_backoff_base_secs * 2 ** attempt))
+
+
+def wfs_url(satellite: str, map_key: str, bbox_str: str) -> str:
+    suffix = config.firms_wfs_url_suffix.replace('<satellite>', satellite).replace('<bbox>', bbox_str) \
+        .replace('<count>', str(config.firms_wfs_count))
+    return f"{config.firms_wfs_url_prefix}/{map_key}/{suffix}"
+
+
+def bbox_string(bbox: Tuple[float, float, float, float]) -> str:
+    """WFS BBOX parameter of a (minLon, minLat, maxLon, maxLat) box; EPSG:4326 is in lat/lon axis order."""
+    return f"{bbox[1]},{bbox[0]},{bbox[3]},{bbox[2]}"
+
+
+def split_bbox(bbox: Tuple[float, float, float, float], nx: int, ny: int) -> List[Tuple[float, float, float, float]]:
+    """Split a (minLon, minLat, maxLon, maxLat) box into an ``nx`` by ``ny`` grid of tiles."""
+    lons = [bbox[0] + (bbox[2] - bbox[0]) * i / nx for i in range(nx + 1)]
+    lats = [bbox[1] + (bbox[3] - bbox[1]) * j / ny for j in range(ny + 1)]
+    return [(lons[i], lats[j], lons[i + 1], lats[j + 1]) for j in range(ny) for i in range(nx)]
+
+
+def dedupe(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop repeated detections, e.g. points on a shared tile edge returned by both tiles, by row hash."""
+    hashes = pd.util.hash_pandas_object(df, index=False)
+    return df[~hashes.duplicated().to_numpy()].reset_index(drop=True)
+
+
+def fetch_wfs(satellite: str, map_key: str, bbox_str: str) -> pd.DataFrame:
+    """Download one satellite's detections with a MAP_KEY, rate-limited per key and retried with backoff."""
+    return fetch_csv(wfs_url(satellite, map_key, bbox_str), map_key, satellite)
+
+
+def fetch_csv(url: str, map_key: str, satellite: str) -> pd.DataFrame:
+    """Read a FIRMS CSV response, taking a token from ``map_key``'s rate limit for every attempt."""
+    for attempt in range(1, config.firms_max_retries + 1):
+        rate_limiter(map_key).acquire()
+        retry_after = None
+        try:
+            with urllib.request.urlopen(url, timeout=config.firms_wfs_timeout_secs) as response:
+                return pd.read_csv(io.BytesIO(response.read()))
+        except urllib.error.HTTPError as e:
+            # Client errors other than throttling won't go away on retry
+            if e.code < 500 and e.code != 429:
+                logger.exception(f"FIRMS API rejected the request for {satellite}")
+                raise
+            retry_after = e.headers.get('Retry-After') if e.headers else None
+            error = e
+        # A connection cut mid-body surfaces as a short read or as a CSV truncated mid-row
+        except (urllib.error.URLError, ConnectionError, TimeoutError, http.client.IncompleteRead,
+                pd.errors.ParserError) as e:
+            error = e
+        if attempt == config.firms_max_retries:
+            logger.error(f"Unable to retrieve {satellite} data from the FIRMS API", exc_info=error)
+            raise error
+        delay = backoff_delay(attempt, retry_after)
+        logger.warning(f"Retrying {satellite} {attempt}/{config.firms_max_retries} in {delay:.1f}s "
+                       f"after failure to retrieve data from FIRMS API: {error}")
+        time.sleep(delay)
+
+
+def fetch_all(bbox: Tuple[float, float, float, float]) -> List[pd.DataFrame]:
+    """Download every satellite over ``bbox`` in parallel tiles, spreading satellites over the MAP_KEYs.
+
+    The bbox is split into tiles of about ``firms_tile_degrees``. A tile whose
+    response hits the ``firms_wfs_count`` cap may have been truncated, so it
+    is split into quadrants and fetched again. Tiling thus adapts to
+    detection density: sparse regions take one request and busy fires get
+    small tiles. Requests only wait on their own key's rate limit, so the
+    wall time is that of the slowest chain of refinements rather than the
+    sum of all requests.
+    """
+    if not config.firms_api_map_keys:
+        raise ValueError("No FIRMS MAP_KEY configured in Settings.firms_api_map_keys")
+    pairs = list(zip(config.satellites, itertools.cycle(config.firms_api_map_keys)))
+    nx = max(1, math.ceil((bbox[2] - bbox[0]) / config.firms_tile_degrees))
+    ny = max(1, math.ceil((bbox[3] - bbox[1]) / config.firms_tile_degrees))
+    frames = []
+    with ThreadPoolExecutor(max_workers=config.firms_max_workers, thread_name_prefix='firms') as pool:
+        pending = {}
+
+        def submit(satellite, map_key, tile):
+            pending[pool.submit(fetch_wfs, satellite, map_key, bbox_string(tile))] = (satellite, map_key, tile)
+
+        for satellite, map_key in pairs:
+            for tile in split_bbox(bbox, nx, ny):
+                submit(satellite, map_key, tile)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                satellite, map_key, tile = pending.pop(future)
+                tile_df = future.result()
+                if len(tile_df) >= config.firms_wfs_count:
+                    if min(tile[2] - tile[0], tile[3] - tile[1]) > config.firms_min_tile_degrees:
+                        for quadrant in split_bbox(tile, 2, 2):
+                            submit(satellite, map_key, quadrant)
+                        continue
+                    logger.warning(f"{satellite} tile {bbox_string(tile)} hit the {config.firms_wfs_count} "
+                                   f"feature cap at the minimum tile size; it may be truncated")
+                frames.append(tile_df)
+    logger.info(f"Fetched {len(frames)} tiles")
+    return frames
+
+
+class DetectionStore:
+    """Persistent, append-only archive of FIRMS detections, partitioned by day.
+
+    Rows live in Parquet parts under ``ACQ_DATE=<day>/``; every run that
+    brings new rows adds one part per day it touches and never rewrites old
+    ones. Each satellite has an ``ACQ_DT`` watermark, the newest detection
+    stored for it. Incoming rows more than ``index_hours`` behind it are taken
+    as already archived. The rest are checked against a sorted array of
+    64-bit hashes of the detections stored in that window, so a run reads
+    and writes state proportional to the window and the new rows, not the
+    archive.
+
+    The hash index and watermarks are committed together in one atomic
+    file after the parts are written; parts left behind by an interrupted
+    run are removed by the next writer. Opening and appending hold an
+    exclusive lock on ``_lock`` in the store, and an append re-reads the
+    committed state under it, so concurrent writers (e.g. overlapping cron
+    runs) take turns instead of overwriting each other's parts and state.
+    """
+
+    KEY_COLUMNS = ['SATELLITE', 'LATITUDE', 'LONGITUDE', 'ACQ_DT']
+
+    def __init__(self, root: str, index_hours: int = 72):
+        self.root = root
+        self.index_hours = index_hours
+        os.makedirs(root, exist_ok=True)
+        self.state_path = os.path.join(root, '_state.npz')
+        self.lock_path = os.path.join(root, '_lock')
+        with self._locked():
+            self._recover()
+
+    def append(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Store the rows of processed detections (see ``process_detections``) not seen before; returns them."""
+        if df.empty:
+            return df
+        times = pd.to_datetime(df['ACQ_DT'], utc=True).dt.tz_localize(None).to_numpy('datetime64[s]')
+        satellites = df['SATELLITE'].astype(str).to_numpy() if 'SATELLITE' in df else np.full(len(df), 'all')
+        keys = [column for column in self.KEY_COLUMNS if column in df]
+        hashes = pd.util.hash_pandas_object(df[keys], index=False).to_numpy(np.uint64)
+        with self._locked():
+            # Another writer may have committed since this store was opened
+            self._recover()
+            return self._append(df, times, satellites, hashes)
+
+    def _append(self, df: pd.DataFrame, times: np.ndarray, satellites: np.ndarray,
+                hashes: np.ndarray) -> pd.DataFrame:
+        window = np.timedelta64(self.index_hours, 'h')
+        recent = np.ones(len(df), dtype=bool)
+        for satellite, watermark in self.watermarks.items():
+            recent &= (satellites != satellite) | (times > np.datetime64(watermark) - window)
+
+        found = np.searchsorted(self.hashes, hashes)
+        seen = found < len(self.hashes)
+        seen[seen] = self.hashes[found[seen]] == hashes[seen]
+        fresh = recent & ~seen & ~pd.Series(hashes).duplicated().to_numpy()
+        new_rows = df[fresh]
+        if new_rows.empty:
+            logger.info("No new detections to store")
+            return new_rows
+
+        run = self.run + 1
+        write_day_partitions(new_rows, self.root, f'part-{run:08d}')
+
+        for satellite in np.unique(satellites[fresh]):
+            newest = times[fresh][satellites[fresh] == satellite].max()
+            if satellite not in self.watermarks or newest > np.datetime64(self.watermarks[satellite]):
+                self.watermarks[satellite] = str(newest)
+        # Hashes older than every watermark's window can't be matched again
+        cutoff = min(np.datetime64(watermark) for watermark in self.watermarks.values()) - window
+        hashes = np.r_[self.hashes, hashes[fresh]]
+        times_kept = np.r_[self.times, times[fresh]]
+        keep = times_kept > cutoff
+        order = np.argsort(hashes[keep], kind='stable')
+        self.hashes, self.times = hashes[keep][order], times_kept[keep][order]
+        self.run = run
+        self._commit()
+        logger.info(f"Stored {len(new_rows)} new detections in {self.root} (watermarks: {self.watermarks})")
+        return new_rows
+
+    def read(self, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """Stored detections with ``ACQ_DATE`` between ``start`` and ``end`` (inclusive ISO dates)."""
+        frames = []
+        for path in sorted(glob.glob(os.path.join(self.root, 'ACQ_DATE=*', 'part-*.parquet'))):
+            day = os.path.basename(os.path.dirname(path))[len('ACQ_DATE='):]
+            if (start is None or day >= start) and (end is None or day <= end):
+                frames.append(pd.read_parquet(path).assign(ACQ_DATE=day))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def _recover(self):
+        """Read the committed state and drop parts of a run that never committed; needs the lock."""
+        if os.path.exists(self.state_path):
+            with np.load(self.state_path) as state:
+                self.hashes, self.times = state['hashes'], state['times']
+                self.watermarks = json.loads(str(state['watermarks']))
+                self.run = int(state['run'])
+        else:
+            self.hashes = np.zeros(0, dtype=np.uint64)  # sorted
+            self.times = np.zeros(0, dtype='datetime64[s]')  # ACQ_DT of each hash
+            self.watermarks = {}
+            self.run = 0
+        for orphan in glob.glob(os.path.join(self.root, '*', f'part-{self.run + 1:08d}.parquet')):
+            os.remove(orphan)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _commit(self):
+        temp_path = self.state_path + '.tmp.npz'
+        np.savez(temp_path, hashes=self.hashes, times=self.times, watermarks=json.dumps(self.watermarks),
+                 run=self.run)
+        os.replace(temp_path, self.state_path)
+
+
+def write_day_partitions(df: pd.DataFrame, root: str, part_name: str) -> List[str]:
+    """Write the rows of each ``ACQ_DATE`` to ``root/ACQ_DATE=<day>/<part_name>.parquet``; returns the paths.
+
+    As usual for Hive-style partitions, the day is in the path only, so
+    ``pd.read_parquet(root)`` reads the whole archive back with ``ACQ_DATE``.
+    """
+    paths = []
+    for day, day_rows in df.groupby('ACQ_DATE', sort=True):
+        day_dir = os.path.join(root, f'ACQ_DATE={day}')
+        os.makedirs(day_dir, exist_ok=True)
+        path = os.path.join(day_dir, f'{part_name}.parquet')
+        day_rows.drop(columns='ACQ_DATE').to_parquet(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def date_windows(start: datetime.date, end: datetime.date, days: int) -> List[Tuple[datetime.date, int]]:
+    """Split the inclusive range ``start``..``end`` into (first day, day count) windows of at most ``days``."""
+    windows = []
+    while start <= end:
+        count = min(days, (end - start).days + 1)
+        windows.append((start, count))
+        start += datetime.timedelta(days=count)
+    return windows
+
+
+def area_url(source: str, map_key: str, bbox: Tuple[float, float, float, float],
+             start: datetime.date, days: int) -> str:
+    area = ','.join(str(edge) for edge in bbox)  # the area API takes west,south,east,north
+    return config.firms_area_url.replace('<map_key>', map_key).replace('<source>', source) \
+        .replace('<bbox>', area).replace('<days>', str(days)).replace('<date>', start.isoformat())
+
+
+def backfill(bbox: Tuple[float, float, float, float], start: datetime.date, end: datetime.date,
+             output_dir: Optional[str] = None) -> str:
+    """Download archived detections for ``bbox`` between ``start`` and ``end`` into day-partitioned Parquet.
+
+    The range is split into windows of ``backfill_window_days``. Every
+    (satellite, window) is fetched in parallel on the MAP_KEYs' shared rate
+    limits, and its rows are written as ``<satellite>-<window start>`` parts
+    of each day they cover. After each window completes, a JSON checkpoint
+    in the output directory (underscored, so Parquet readers skip it)
+    records it, and a rerun with the same arguments and window size skips
+    finished windows. A window that was interrupted mid-write just rewrites
+    the same part files, so nothing is duplicated.
+    """
+    if not config.firms_api_map_keys:
+        raise ValueError("No FIRMS MAP_KEY configured in Settings.firms_api_map_keys")
+    output_dir = output_dir or config.backfill_dir
+    os.makedirs(output_dir, exist_ok=True)
+    # Window starts depend on the window size, so a checkpoint is only valid for the size it was made with
+    job = hashlib.sha1(repr((bbox, start.isoformat(), end.isoformat(), config.backfill_sources,
+                             config.backfill_window_days)).encode())
+    checkpoint_path = os.path.join(output_dir, f'_backfill-{job.hexdigest()[:12]}.json')
+    done = set()
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f:
+            done = set(json.load(f)['done'])
+
+    satellites = list(config.backfill_sources.items())
+    tasks = [(satellite, source, map_key, window_start, days)
+             for (satellite, source), map_key in zip(satellites, itertools.cycle(config.firms_api_map_keys))
+             for window_start, days in date_windows(start, end, config.backfill_window_days)
+             if f'{satellite}-{window_start.isoformat()}' not in done]
+    logger.info(f"Backfilling {bbox} from {start} to {end}: {len(tasks)} windows to fetch, "
+                f"{len(done)} already done (checkpoint {checkpoint_path})")
+
+    def fetch_window(satellite, source, map_key, window_start, days):
+        window_df = fetch_csv(area_url(source, map_key, bbox, window_start, days), map_key, satellite)
+        if not window_df.empty:
+            write_day_partitions(process_detections(window_df), output_dir, f'{satellite}-{window_start.isoformat()}')
+        return len(window_df)
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=config.firms_max_workers, thread_name_prefix='backfill') as pool:
+        futures = {pool.submit(fetch_window, *task): task for task in tasks}
+        for future in as_completed(futures):
+            satellite, _, _, window_start, days = futures[future]
+            try:
+                rows = future.result()
+            except Exception as e:
+                # Keep checkpointing the other windows; this one is retried on the next run
+                logger.error(f"Backfill of {satellite} {window_start} + {days} days failed: {e}")
+                failed.append(e)
+                continue
+            done.add(f'{satellite}-{window_start.isoformat()}')
+            temp_path = checkpoint_path + '.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump({'bbox': bbox, 'start': start.isoformat(), 'end': end.isoformat(), 'done': sorted(done)}, f)
+            os.replace(temp_path, checkpoint_path)
+            logger.info(f"Backfilled {satellite} {window_start} + {days} days: {rows} detections "
+                        f"({len(done)} windows done)")
+    if failed:
+        raise failed[0]
+    return output_dir
+
+
+def spatial_order(gdf: gpd.GeoDataFrame) -> np.ndarray:
+    """Row order grouping detections by day, then along a Hilbert curve, then by time.
+
+    Consecutive rows are then close in space and time, so every row group
+    (or index node) covers a small box and bbox reads can skip the rest.
+    """
+    hilbert = gdf.geometry.hilbert_distance() if len(gdf) else np.zeros(0, dtype=np.uint32)
+    return np.lexsort((gdf['ACQ_DT'].to_numpy(), np.asarray(hilbert), gdf['ACQ_DATE'].to_numpy()))
+
+
+def write_geoparquet(gdf: gpd.GeoDataFrame, path: str) -> str:
+    """GeoParquet with space/time-sorted row groups and a bbox covering column for row-group pruning."""
+    path = f'{path}.parquet'
+    gdf.iloc[spatial_order(gdf)].to_parquet(path, index=False, write_covering_bbox=True,
+                                            row_group_size=config.output_row_group_size)
+    return path
+
+
+def write_flatgeobuf(gdf: gpd.GeoDataFrame, path: str) -> str:
+    """FlatGeobuf with a packed Hilbert R-tree, which GDAL and web clients use for bbox reads."""
+    path = f'{path}.fgb'
+    gdf.iloc[spatial_order(gdf)].to_file(path, driver='FlatGeobuf', engine='pyogrio', SPATIAL_INDEX='YES')
+    return path
+
+
+def write_shapefile(gdf: gpd.GeoDataFrame, path: str) -> str:
+    """The legacy shapefile output; column names are cut to the format's 10 characters."""
+    path = f'{path}.shp'
+    gdf.rename(columns={'BRIGHTNESS_2': 'BRIGHT_2'}).to_file(filename=path)
+    return path
+
+
+# Output formats of ``Settings.output_format``: each writes a GeoDataFrame to a path without extension
+WRITERS = {
+    'geoparquet': write_geoparquet,
+    'flatgeobuf': write_flatgeobuf,
+    'shapefile': write_shapefile,
+}
+
+
+def read_output(path: str, bbox: Optional[Tuple[float, float, float, float]] = None) -> gpd.GeoDataFrame:
+    """Read an ingest output, only the detections in ``bbox`` (minLon, minLat, maxLon, maxLat) if given.
+
+    GeoParquet reads skip the row groups whose covering bbox misses
+    ``bbox``, and FlatGeobuf reads walk the R-tree, so only the relevant
+    bytes are read.
+    """
+    if path.endswith('.parquet'):
+        return gpd.read_parquet(path, bbox=bbox)
+    return gpd.read_file(path, bbox=bbox, engine='pyogrio')
+
+
 def ingest(bbox: Tuple[float, float, float, float]):
-    """Main function to get new active wildfire data and save it as a shapefile."""
+    """Main function to get new active wildfire data, archive the new detections and write them out."""
     logger.info("Processing new FIRMS VIIRS Merged Ultra Real Time wildfire data for the last 24 hours")
     get_new_data(bbox)
     logger.info("Done!")
@@ -44,35 +494,37 @@ def ingest(bbox: Tuple[float, float, float, float]):
 def get_new_data(bbox: Tuple[float, float, float, float]):
     """Download the latest VIIRS active URT 24-hour fire data for the specified bounding box."""
     logger.info("Collecting newest VIIRS detections from the FIRMS WFS")
-    bbox_str = f"{bbox[1]},{bbox[0]},{bbox[3]},{bbox[2]}"  # Format: minLon,minLat,maxLon,maxLat
-    region_sat_df_list = []
-
-    for satellite, map_key in zip(config.satellites, config.firms_api_map_keys):
-        logger.info(f"Downloading the last 24 hours of detections for bounding box {bbox_str} from {satellite}")
-        for i in range(1, 6):  # Retry mechanism
-            try:
-                url = f"{config.firms_wfs_url_prefix}/{map_key}/{config.firms_wfs_url_suffix.replace('<satellite>', satellite).replace('<bbox>', bbox_str)}"
-                region_sat_df = pd.read_csv(url)
-                break
-            except (urllib.error.HTTPError, urllib.error.URLError, ConnectionError) as e:
-                if i == 5:
-                    logger.exception("Unable to retrieve newest data from the FIRMS API")
-                    raise e
-                else:
-                    logger.warning(f"Retrying {i}/5 after failure to retrieve data from FIRMS API")
-                    time.sleep(30)
-        region_sat_df_list.append(region_sat_df)
-        time.sleep(config.firms_wfs_request_sleep_secs)
+    logger.info(f"Downloading the last 24 hours of detections for bounding box {bbox_string(bbox)} "
+                f"from {', '.join(config.satellites)}")
+    region_sat_df_list = fetch_all(bbox)
 
     new_fires_df = pd.concat(region_sat_df_list, ignore_index=True)
     logger.info(f"Number of detections pre-deduplication: {len(new_fires_df)}")
-    new_fires_df.drop_duplicates(inplace=True, ignore_index=True)
+    new_fires_df = dedupe(new_fires_df)
     logger.info(f"Number of detections post-deduplication: {len(new_fires_df)}")
 
-    logger.info("Processing WFS data and writing to shapefile")
+    logger.info(f"Processing WFS data and writing it as {config.output_format}")
+    new_fires_df = process_detections(new_fires_df)
+    DetectionStore(config.store_dir, config.store_index_hours).append(new_fires_df)
+    new_fires_gdf = gpd.GeoDataFrame(new_fires_df,
+                                     geometry=gpd.points_from_xy(new_fires_df.LONGITUDE, new_fires_df.LATITUDE))
+    new_fires_gdf.crs = 'EPSG:4326'
+    output_file_path = WRITERS[config.output_format](new_fires_gdf,
+                                                     os.path.join(config.temp_dir, config.output_basename))
+    logger.info(f"Output written to: {output_file_path}")
+
+    return
+
+
+def process_detections(new_fires_df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize raw WFS or area API CSV rows to the archive schema (upper-case columns, ISO ``ACQ_DT``)."""
     new_fires_df.columns = map(str.upper, new_fires_df.columns)
     new_fires_df['ACQ_TIME'] = new_fires_df['ACQ_TIME'].astype(int).astype(str).str.zfill(4)
     new_fires_df['ACQ_DATE'] = new_fires_df['ACQ_DATE'].astype(str)
+    if 'ACQ_DATETIME' not in new_fires_df.columns:
+        # The area API has no combined timestamp; build it in the WFS format
+        new_fires_df['ACQ_DATETIME'] = (new_fires_df['ACQ_DATE'] + ' ' + new_fires_df['ACQ_TIME'].str[:2] + ':'
+                                        + new_fires_df['ACQ_TIME'].str[2:] + ':00+00')
     confidence_value_map_dict = {
         'h': 'high',
         'n': 'nominal',
@@ -83,25 +535,24 @@ def get_new_data(bbox: Tuple[float, float, float, float]):
     new_fires_df.ACQ_DATETIME = new_fires_df.ACQ_DATETIME.str.replace("\\+00", 'Z', regex=True)
     new_fires_df.ACQ_DATETIME = new_fires_df.ACQ_DATETIME.str.replace(' ', 'T')
     new_fires_df.ACQ_DATETIME = new_fires_df.ACQ_DATETIME.str.replace('/', '-')
-    new_fires_df.rename(columns={'ACQ_DATETIME': 'ACQ_DT',
-                                 'BRIGHTNESS_2': 'BRIGHT_2'},
-                        inplace=True)
-    if 'UNNAMED: 1' in new_fires_df.columns:
-        columns_to_drop = ['UNNAMED: 1', 'WKT']
-    else:
-        columns_to_drop = ['WKT']
+    new_fires_df.rename(columns={'ACQ_DATETIME': 'ACQ_DT'}, inplace=True)
+    columns_to_drop = [column for column in ['UNNAMED: 1', 'WKT'] if column in new_fires_df.columns]
     new_fires_df.drop(columns=columns_to_drop, inplace=True)
-    new_fires_gdf = gpd.GeoDataFrame(new_fires_df,
-                                     geometry=gpd.points_from_xy(new_fires_df.LONGITUDE, new_fires_df.LATITUDE))
-    new_fires_gdf.crs = 'EPSG:4326'
-    output_file_path = os.path.join(config.temp_dir, config.output_shp_filename)
-    new_fires_gdf.to_file(filename=output_file_path)
-    logger.info(f"Shapefile written to: {output_file_path}")
-
-    return
+    return new_fires_df
 
 
 if __name__ == '__main__':
-    # User-provided bounding box (example: -90, -180, 90, 180)
-    user_bbox = (-125.0, 25.0, -65.0, 49.0)  # Example for the contiguous USA
-    ingest(user_bbox)
+    parser = argparse.ArgumentParser(description="Ingest FIRMS VIIRS detections")
+    parser.add_argument('--bbox', type=float, nargs=4, metavar=('MIN_LON', 'MIN_LAT', 'MAX_LON', 'MAX_LAT'),
+                        default=(-125.0, 25.0, -65.0, 49.0))  # Example for the contiguous USA
+    parser.add_argument('--backfill', nargs=2, metavar=('START', 'END'), type=datetime.date.fromisoformat,
+                        help="download archived detections for these dates (inclusive) instead of the last 24 hours")
+    parser.add_argument('--output-dir', help="backfill output directory (default: Settings.backfill_dir)")
+    parser.add_argument('--format', choices=sorted(WRITERS), default=config.output_format,
+                        help="format of the 24 hour output")
+    args = parser.parse_args()
+    config.output_format = args.format
+    if args.backfill:
+        backfill(tuple(args.bbox), *args.backfill, output_dir=args.output_dir)
+    else:
+        ingest(tuple(args.bbox))
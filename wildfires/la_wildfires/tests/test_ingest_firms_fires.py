@@ -0,0 +1,163 @@
+import http.client
+import threading
+import time
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import ingest_firms_fires as ingest
+import pytest
+
+CSV = b"latitude,longitude,bright_ti4,acq_date,acq_time\n34.1,-118.5,330.2,2025-01-08,1030\n34.2,-118.4,341.7,2025-01-08,1030\n"
+
+
+class FirmsStub:
+    """Local stand-in for the FIRMS WFS, answering each request with ``respond(path)``.
+
+    ``respond`` returns ``(status, headers, body)``; a body shorter than the
+    ``Content-Length`` header simulates a connection cut mid-response.
+    """
+
+    def __init__(self):
+        self.paths = []
+        self.respond = lambda path: (200, {}, CSV)
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.paths.append(self.path)
+                status, headers, body = stub.respond(self.path)
+                self.send_response(status)
+                headers = {'Content-Length': str(len(body)), **headers}
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+                self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def script(self, *responses):
+        """Answer the next requests with ``responses`` in order, then with the last one"""
+        remaining = list(responses)
+        lock = threading.Lock()
+
+        def respond(path):
+            with lock:
+                return remaining.pop(0) if len(remaining) > 1 else remaining[0]
+        self.respond = respond
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    stub = FirmsStub()
+    monkeypatch.setattr(ingest.config, 'firms_wfs_url_prefix', stub.url)
+    monkeypatch.setattr(ingest.config, 'firms_max_retries', 3)
+    monkeypatch.setattr(ingest.config, 'firms_backoff_base_secs', 0.01)
+    monkeypatch.setattr(ingest.config, 'firms_wfs_timeout_secs', 5)
+    monkeypatch.setattr(ingest, '_buckets', {})
+    yield stub
+    stub.close()
+
+
+def fetch(map_key='key', satellite='snpp'):
+    return ingest.fetch_wfs(satellite, map_key, ingest.bbox_string((-118.7, 33.9, -118.1, 34.4)))
+
+
+@pytest.mark.parametrize('status', [429, 500, 503])
+def test_throttling_and_server_errors_are_retried(stub, status):
+    stub.script((status, {'Retry-After': '0'}, b''), (200, {}, CSV))
+    df = fetch()
+    assert len(df) == 2
+    assert len(stub.paths) == 2
+
+
+def test_backoff_waits_for_retry_after(stub):
+    stub.script((429, {'Retry-After': '1'}, b''), (200, {}, CSV))
+    started = time.monotonic()
+    fetch()
+    assert time.monotonic() - started >= 1
+
+
+def test_client_errors_are_not_retried(stub):
+    stub.script((404, {}, b'not found'))
+    with pytest.raises(urllib.error.HTTPError):
+        fetch()
+    assert len(stub.paths) == 1
+
+
+def test_gives_up_after_max_retries(stub):
+    stub.script((500, {}, b''))
+    with pytest.raises(urllib.error.HTTPError):
+        fetch()
+    assert len(stub.paths) == ingest.config.firms_max_retries
+
+
+def test_truncated_body_is_retried(stub):
+    stub.script((200, {'Content-Length': str(len(CSV) + 100)}, CSV[:40]), (200, {}, CSV))
+    df = fetch()
+    assert len(df) == 2
+    assert len(stub.paths) == 2
+
+
+def test_truncated_body_fails_with_its_cause(stub):
+    stub.script((200, {'Content-Length': str(len(CSV) + 100)}, CSV[:40]))
+    with pytest.raises(http.client.IncompleteRead):
+        fetch()
+    assert len(stub.paths) == ingest.config.firms_max_retries
+
+
+def test_rate_limit_is_per_map_key(stub, monkeypatch):
+    # Two requests per key per second, in bursts of two
+    monkeypatch.setattr(ingest.config, 'firms_transactions_per_key', 2)
+    monkeypatch.setattr(ingest.config, 'firms_transaction_window_secs', 1)
+    started = time.monotonic()
+    for _ in range(4):
+        fetch('a')
+    assert time.monotonic() - started >= 0.9
+
+    started = time.monotonic()
+    for _ in range(2):
+        fetch('b')
+    assert time.monotonic() - started < 0.5
+
+
+def test_satellites_are_fetched_concurrently_with_their_own_keys(stub, monkeypatch):
+    monkeypatch.setattr(ingest.config, 'satellites', ['snpp', 'noaa20'])
+    monkeypatch.setattr(ingest.config, 'firms_api_map_keys', ['k1', 'k2'])
+    monkeypatch.setattr(ingest.config, 'firms_max_workers', 4)
+
+    def slow(path):
+        time.sleep(0.5)
+        return 200, {}, CSV
+    stub.respond = slow
+
+    started = time.monotonic()
+    frames = ingest.fetch_all((-118.7, 33.9, -118.1, 34.4))
+    assert time.monotonic() - started < 0.9
+    assert len(frames) == 2
+    assert sorted((path.split('/')[1], 'fires_snpp' in path) for path in stub.paths) == [('k1', True), ('k2', False)]
+
+
+def test_capped_tiles_are_split(stub, monkeypatch):
+    monkeypatch.setattr(ingest.config, 'satellites', ['snpp'])
+    monkeypatch.setattr(ingest.config, 'firms_api_map_keys', ['k1'])
+    monkeypatch.setattr(ingest.config, 'firms_wfs_count', 2)
+    monkeypatch.setattr(ingest.config, 'firms_min_tile_degrees', 0.2)
+    bbox = (-118.7, 33.9, -118.1, 34.4)
+    full = ingest.bbox_string(bbox)
+
+    # Only the whole tile hits the cap; its quadrants return one row each
+    stub.respond = lambda path: (200, {}, CSV if f"BBOX={full}" in path else CSV[:CSV.index(b'\n34.2')] + b'\n')
+    frames = ingest.fetch_all(bbox)
+    assert len(stub.paths) == 5
+    assert [len(frame) for frame in frames] == [1, 1, 1, 1]